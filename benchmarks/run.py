@@ -0,0 +1,324 @@
+"""Load-test / benchmark driver for the Alosra Recipez API.
+
+Examples:
+    # Seed a synthetic dataset into a local SQLite file and run the mix in-process
+    python -m benchmarks.run --db sqlite:///./bench.db --seed --recipes 100000 --users 100000 --orders 1000000
+
+    # Drive an already running server (uvicorn main:app) and save a baseline
+    python -m benchmarks.run --base-url http://127.0.0.1:8000 --save-baseline benchmarks/baseline.json
+
+    # Compare against a stored baseline, exit code 1 on regression
+    python -m benchmarks.run --db sqlite:///./bench.db --compare benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+# Workload mix: (scenario name, weight)
+DEFAULT_MIX = [
+    ("browse_categories", 15),
+    ("list_recipes", 25),
+    ("recipe_detail", 20),
+    ("category_recipes", 10),
+    ("cart_add", 12),
+    ("view_cart", 8),
+    ("checkout", 5),
+    ("order_history", 5),
+]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile over an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    """Thread-safe latency recorder keyed by endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def report(self, wall_seconds):
+        endpoints = {}
+        total = 0
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            total += len(values)
+            endpoints[endpoint] = {
+                "count": len(values),
+                "errors": self.errors[endpoint],
+                "rps": round(len(values) / wall_seconds, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+            }
+        return {
+            "wall_seconds": round(wall_seconds, 2),
+            "total_requests": total,
+            "total_rps": round(total / wall_seconds, 2),
+            "endpoints": endpoints,
+        }
+
+
+class VirtualUser:
+    """One logged-in client walking through the workload mix"""
+
+    def __init__(self, client, recorder, email, password, catalog, rng):
+        self.client = client
+        self.recorder = recorder
+        self.email = email
+        self.password = password
+        self.catalog = catalog
+        self.rng = rng
+        self.headers = {}
+
+    def call(self, endpoint, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.client.request(method, url, headers=self.headers, **kwargs)
+            ok = response.status_code < 400
+        except Exception:
+            response = None
+            ok = False
+        self.recorder.record(endpoint, time.perf_counter() - start, ok)
+        return response
+
+    def login(self):
+        response = self.call("POST /auth/login", "POST", "/auth/login",
+                             json={"email": self.email, "password": self.password})
+        if response is None or response.status_code != 200:
+            raise RuntimeError(f"Could not log in benchmark user {self.email}")
+        self.headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+    def browse_categories(self):
+        self.call("GET /api/categories/", "GET", "/api/categories/")
+
+    def list_recipes(self):
+        params = {"skip": self.rng.randint(0, 5) * 20, "limit": 20}
+        if self.rng.random() < 0.5:
+            params["category_id"] = self.rng.choice(self.catalog["categories"])
+        self.call("GET /api/recipes/", "GET", "/api/recipes/", params=params)
+
+    def recipe_detail(self):
+        recipe_id = self.rng.choice(self.catalog["recipes"])
+        self.call("GET /api/recipes/{id}", "GET", f"/api/recipes/{recipe_id}")
+
+    def category_recipes(self):
+        category_id = self.rng.choice(self.catalog["categories"])
+        self.call("GET /api/categories/{id}/recipes", "GET", f"/api/categories/{category_id}/recipes")
+
+    def cart_add(self):
+        self.call("POST /api/cart/add", "POST", "/api/cart/add", json={
+            "recipe_id": self.rng.choice(self.catalog["recipes"]),
+            "number_of_people": self.rng.randint(1, 6),
+        })
+
+    def view_cart(self):
+        self.call("GET /api/cart/", "GET", "/api/cart/")
+
+    def checkout(self):
+        items = [
+            {"recipe_id": self.rng.choice(self.catalog["recipes"]), "number_of_people": self.rng.randint(1, 6)}
+            for _ in range(self.rng.randint(1, 3))
+        ]
+        self.call("POST /api/orders/", "POST", "/api/orders/", json={
+            "delivery_address": "Building 1, Road 1, Manama",
+            "delivery_phone": "+973-1234-5678",
+            "items": items,
+        })
+
+    def order_history(self):
+        self.call("GET /api/orders/", "GET", "/api/orders/")
+
+
+def load_catalog(client, sample_size=2000):
+    """Collect category and recipe ids to drive the mix with"""
+    categories = [c["id"] for c in client.get("/api/categories/").json()]
+    recipes = []
+    for skip in range(0, sample_size, 100):
+        page = client.get("/api/recipes/", params={"skip": skip, "limit": 100}).json()
+        recipes.extend(r["id"] for r in page)
+        if len(page) < 100:
+            break
+    if not categories or not recipes:
+        raise RuntimeError("Catalog is empty - seed the database first (--seed)")
+    return {"categories": categories, "recipes": recipes}
+
+
+def make_client_factory(args):
+    if args.base_url:
+        import httpx
+        return lambda: httpx.Client(base_url=args.base_url, timeout=30)
+
+    from fastapi.testclient import TestClient
+    from main import app
+    return lambda: TestClient(app)
+
+
+def bench_users(args, count):
+    """Emails of synthetic users created by seed.seed_synthetic"""
+    from sqlalchemy import select
+    from database import engine
+    from models import UserModel
+    from seed import SYNTHETIC_EMAIL_DOMAIN
+
+    with engine.connect() as conn:
+        emails = conn.execute(
+            select(UserModel.email)
+            .where(UserModel.email.like(f"%@{SYNTHETIC_EMAIL_DOMAIN}"))
+            .order_by(UserModel.id)
+            .limit(count)
+        ).scalars().all()
+    if not emails:
+        raise RuntimeError("No benchmark users found - seed the database first (--seed)")
+    return emails
+
+
+def run_workload(args):
+    from seed import SYNTHETIC_PASSWORD
+
+    client_factory = make_client_factory(args)
+    catalog = load_catalog(client_factory())
+    emails = bench_users(args, args.concurrency)
+    scenarios = [name for name, _ in DEFAULT_MIX]
+    weights = [weight for _, weight in DEFAULT_MIX]
+
+    recorder = Recorder()
+    per_user = args.requests // args.concurrency if args.requests else None
+    barrier = threading.Barrier(args.concurrency + 1)
+
+    def worker(index):
+        rng = random.Random(args.rng_seed + index)
+        user = VirtualUser(client_factory(), recorder, emails[index % len(emails)], SYNTHETIC_PASSWORD, catalog, rng)
+        user.login()
+        barrier.wait()
+        deadline = time.perf_counter() + args.duration
+        done = 0
+        while True:
+            if per_user is not None:
+                if done >= per_user:
+                    break
+            elif time.perf_counter() >= deadline:
+                break
+            getattr(user, rng.choices(scenarios, weights)[0])()
+            done += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+
+    # Logins happen before the barrier so they don't skew the measured window
+    recorder.latencies.pop("POST /auth/login", None)
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return recorder.report(time.perf_counter() - start)
+
+
+def compare(report, baseline, tolerance):
+    """Return a list of regressions of report vs. baseline"""
+    regressions = []
+    for endpoint, old in baseline.get("endpoints", {}).items():
+        new = report["endpoints"].get(endpoint)
+        if not new:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if old[metric] and new[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{endpoint} {metric}: {old[metric]} -> {new[metric]}")
+        if old["rps"] and new["rps"] < old["rps"] * (1 - tolerance):
+            regressions.append(f"{endpoint} rps: {old['rps']} -> {new['rps']}")
+    return regressions
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<36}{'count':>8}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, stats in report["endpoints"].items():
+        print(f"{endpoint:<36}{stats['count']:>8}{stats['errors']:>6}{stats['rps']:>10}"
+              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+    print(f"\nTotal: {report['total_requests']} requests in {report['wall_seconds']}s "
+          f"({report['total_rps']} req/s)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Alosra Recipez API")
+    parser.add_argument("--db", help="Database URI to seed / run against (sets DB_URI)")
+    parser.add_argument("--base-url", help="Drive a running server instead of the in-process app")
+    parser.add_argument("--seed", action="store_true", help="Load the synthetic dataset before running")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=8, help="Number of virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run the mix")
+    parser.add_argument("--requests", type=int, help="Total requests to send (overrides --duration)")
+    parser.add_argument("--rng-seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--save-baseline", help="Store the report as a baseline JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.db:
+        os.environ["DB_URI"] = args.db
+    if not args.base_url:
+        # Every in-process virtual user shares one client IP, so per-IP limits would skew results
+        os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    if args.seed:
+        from seed import seed_all
+
+        start = time.perf_counter()
+        seed_all(
+            batch_size=args.batch_size,
+            categories=args.categories,
+            recipes=args.recipes,
+            users=args.users,
+            orders=args.orders,
+        )
+        print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+    report = run_workload(args)
+    print_report(report)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"Report written to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Micro-benchmark of JSON rendering for the high-volume response schemas.
+
+Compares, per payload, the classic jsonable_encoder + json.dumps path (what a
+plain JSONResponse does), FastJSONResponse (utils/responses.py) and FastAPI's
+response_model path (Pydantic straight to bytes). No database or server needed.
+
+Example:
+    python -m benchmarks.serialization --items 100 --repeat 200
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from serializers.category_serializers import CategoryResponseSchema
+from serializers.recipe_serializers import RecipeResponseSchema
+from serializers.cart_serializers import CartItemResponseSchema, CartResponseSchema
+from serializers.order_serializers import OrderItemResponseSchema, OrderResponseSchema
+from utils.responses import FastJSONResponse, orjson
+
+
+def build_payloads(items: int):
+    now = datetime.now(timezone.utc)
+    category = CategoryResponseSchema(
+        id=1, name="Arabic Cuisine", description="Traditional Middle Eastern and Bahraini dishes " * 2,
+        image_url="https://example.com/images/arabic-cuisine.jpg", is_active=True, display_order=1, created_at=now
+    )
+    recipes = [
+        RecipeResponseSchema(
+            id=i, name=f"Recipe {i}", description="Slow cooked rice with tender chicken and aromatic spices. " * 3,
+            base_price=Decimal("8.50") + Decimal(i % 7), prep_time_minutes=45, difficulty="medium",
+            image_url=f"https://example.com/images/{i}.jpg", category_id=1, is_available=True,
+            created_at=now - timedelta(days=i), category=category
+        )
+        for i in range(1, items + 1)
+    ]
+    cart = CartResponseSchema(
+        items=[
+            CartItemResponseSchema(
+                id=i, user_id=1, recipe_id=recipe.id, number_of_people=2, created_at=now, updated_at=now,
+                recipe=recipe, calculated_price=recipe.base_price * 2
+            )
+            for i, recipe in enumerate(recipes[:20], start=1)
+        ],
+        total_amount=sum(recipe.base_price * 2 for recipe in recipes[:20]),
+        total_items=min(20, items)
+    )
+    orders = [
+        OrderResponseSchema(
+            id=i, user_id=1, total_amount=Decimal("51.00"), status="delivered", delivery_address="Road 1, Manama",
+            delivery_phone="+97300000000", order_date=now, estimated_delivery=now + timedelta(hours=2), created_at=now,
+            order_items=[
+                OrderItemResponseSchema(
+                    id=i * 10 + j, recipe_id=recipe.id, number_of_people=3, unit_price=recipe.base_price,
+                    calculated_price=recipe.base_price * 3, recipe=recipe
+                )
+                for j, recipe in enumerate(recipes[i % items:i % items + 3])
+            ]
+        )
+        for i in range(items)
+    ]
+    return {
+        f"recipes x{items}": (List[RecipeResponseSchema], recipes),
+        "cart (20 items)": (CartResponseSchema, cart),
+        f"orders x{items}": (List[OrderResponseSchema], orders),
+    }
+
+
+def timed(function, repeat: int) -> float:
+    """Best of 3 runs, microseconds per call"""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        best = min(best, (time.perf_counter() - started) / repeat)
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100, help="Recipes / orders per list payload")
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per timing run")
+    args = parser.parse_args()
+
+    print(f"FastJSONResponse encoder: {'orjson' if orjson else 'pydantic-core'}")
+    print(f"{'payload':<18}{'jsonable_encoder':>18}{'FastJSONResponse':>18}{'response_model':>16}{'speedup':>10}")
+    for name, (schema, payload) in build_payloads(args.items).items():
+        adapter = TypeAdapter(schema)
+        response = FastJSONResponse(None)
+        classic = timed(lambda: json.dumps(jsonable_encoder(payload)).encode(), args.repeat)
+        fast = timed(lambda: response.render(payload), args.repeat)
+        model = timed(lambda: adapter.dump_json(payload), args.repeat)
+        assert json.loads(response.render(payload)) == json.loads(adapter.dump_json(payload))
+        print(f"{name:<18}{classic:>16.0f}us{fast:>16.0f}us{model:>14.0f}us{classic / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,96 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7 
+
+    # Token revocation: how often each worker reloads its Bloom filter of revoked sessions
+    REVOCATION_SYNC_SECONDS: int = 30
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+
+    # Password hashing: bcrypt cost and the dedicated hashing pool
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_RETRY_AFTER: int = 2
+    # Threads used to hash passwords during bulk user imports (0 = one per CPU core)
+    BULK_HASH_WORKERS: int = 0
     DEBUG: bool = True
     FRONTEND_URL: str = "http://localhost:8081 "
     ENVIRONMENT: str = "development"
 
+    # Rate limiting - "N/second", "N/minute" or "N/hour" token buckets, empty disables
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_AUTH_PER_IP: str = "20/minute"
+    RATE_LIMIT_API_PER_IP: str = "600/minute"
+    RATE_LIMIT_API_PER_USER: str = "300/minute"
+    # "memory" (per worker) or a SQLite file path shared by the workers on one host
+    RATE_LIMIT_STORE: str = "memory"
+    # Use the first X-Forwarded-For address as client IP (only behind a trusted proxy)
+    TRUST_FORWARDED_FOR: bool = False
+
+    # Load shedding: concurrent requests per route group (0 = unlimited) and queueing delay targets
+    LOAD_SHEDDING_ENABLED: bool = True
+    CONCURRENCY_CATALOG: int = 16
+    CONCURRENCY_CART: int = 8
+    CONCURRENCY_CHECKOUT: int = 8
+    CONCURRENCY_AUTH: int = 4
+    SHED_TARGET_MS: int = 50
+    SHED_INTERVAL_MS: int = 500
+    SHED_MAX_WAIT_MS: int = 2000
+
+    # Response compression: smallest body worth compressing, smallest body compressed off the event loop, levels, and the shared pre-compressed body cache
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_THREAD_MIN_SIZE: int = 64 * 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+
+    # GET route cache (per worker): entry lifetime, max entries, and how long a request waits for another one computing the same key
+    ROUTE_CACHE_ENABLED: bool = True
+    ROUTE_CACHE_TTL_SECONDS: int = 30
+    ROUTE_CACHE_MAX_ENTRIES: int = 1024
+    ROUTE_CACHE_WAIT_SECONDS: int = 10
+
+    # Batch endpoint: calls per batch and how many of them run at once
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_MAX_CONCURRENCY: int = 8
+
+    # Comma separated emails allowed to use the /api/admin endpoints
+    ADMIN_EMAILS: str = ""
+
+    # Catalog import
+    CATALOG_IMPORT_CHUNK_SIZE: int = 500
+    CATALOG_IMPORT_MAX_ERRORS: int = 1000
+
+    # Rows fetched per server-side cursor batch when exporting
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Kitchen work queue: how long a claim lasts without a heartbeat, and max orders per claim
+    KITCHEN_LEASE_SECONDS: int = 300
+    KITCHEN_CLAIM_MAX: int = 20
+
+    # "Frequently ordered together": related recipes kept per recipe, and full rebuild interval
+    RELATED_TOP_K: int = 10
+    RELATED_REBUILD_SECONDS: int = 3600
+
+    # Popularity rankings: how often sorted rankings are recomputed, and full rebuild interval
+    POPULARITY_REFRESH_SECONDS: int = 60
+    POPULARITY_REBUILD_SECONDS: int = 3600
+
+    # Delivery slots: window length, orders per window, minimum prep lead time and how far ahead to book
+    DELIVERY_SLOT_MINUTES: int = 30
+    DELIVERY_SLOT_CAPACITY: int = 10
+    DELIVERY_LEAD_MINUTES: int = 60
+    DELIVERY_HORIZON_HOURS: int = 48
+    # How often each worker creates upcoming slots and reloads free ones (picks up cancellations made on other workers)
+    DELIVERY_SLOT_SYNC_SECONDS: int = 30
+
+    # Abandoned cart purge: retention by last update (0 = keep forever), batch size, pause between batches and run interval
+    CART_RETENTION_DAYS: int = 30
+    CART_PURGE_BATCH_SIZE: int = 500
+    CART_PURGE_BATCH_PAUSE_MS: int = 200
+    CART_PURGE_INTERVAL_SECONDS: int = 3600
+
     # Uvicorn settings
     APP_HOST: str = "127.0.0.1"
     APP_PORT: int = 8000
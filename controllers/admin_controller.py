@@ -0,0 +1,357 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import ValidationError
+from typing import Optional
+from decimal import Decimal
+import csv
+import io
+import json
+from database import get_db
+from models.recipe import Recipe
+from models.category import Category
+from models.user import UserModel, USER_PUBLIC_COLUMNS
+from serializers.recipe_serializers import RecipeImportRow
+from serializers.category_serializers import CategoryImportRow
+from serializers.user_serializers import UserImportRow, UserActiveUpdate, UserResponseSchema
+from serializers.admin_serializers import ImportReport, ImportRowError, ExportDataset, CartPurgeMetrics, RouteCacheMetrics
+from dependencies.auth import get_current_admin_user
+from utils.tokens import TokenPrincipal, revoke_user
+from utils.bulk import upsert, insert_ignore
+from utils.security import hash_passwords
+from utils.catalog_events import notify_catalog_change, catalog_version
+from utils.export import stream_export
+from utils.cart_purge import cart_purger
+from utils.route_cache import route_cache
+from config.enviroment import settings
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+IMPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def _detect_format(file: UploadFile, fmt: Optional[str]) -> str:
+    """Pick csv or ndjson from the query parameter, filename or content type"""
+    if fmt:
+        if fmt not in ("csv", "ndjson"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Format must be 'csv' or 'ndjson'"
+            )
+        return fmt
+
+    filename = (file.filename or "").lower()
+    for suffix, detected in IMPORT_FORMATS.items():
+        if filename.endswith(suffix):
+            return detected
+
+    content_type = (file.content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Could not detect the file format, pass ?format=csv or ?format=ndjson"
+    )
+
+
+def _iter_rows(file: UploadFile, fmt: str):
+    """Yield (row_number, data, error) one row at a time without loading the file"""
+    text = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+
+    if fmt == "csv":
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            # Empty cells fall back to the schema defaults
+            yield row_number, {key: value for key, value in row.items() if key and value not in ("", None)}, None
+        return
+
+    for row_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line, parse_float=Decimal)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, data, None
+
+
+def _add_error(report: ImportReport, row_number: int, errors):
+    report.failed += 1
+    if len(report.errors) < settings.CATALOG_IMPORT_MAX_ERRORS:
+        report.errors.append(ImportRowError(row=row_number, errors=errors))
+    else:
+        report.errors_truncated = True
+
+
+def _validation_messages(error: ValidationError):
+    return [f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()]
+
+
+def _run_import(file: UploadFile, fmt: str, row_schema, apply_chunk, db: Session, catalog: bool = True) -> ImportReport:
+    """Validate rows in chunks and hand each chunk to apply_chunk in its own transaction"""
+    report = ImportReport(catalog_version=catalog_version())
+    recipe_ids = set()
+    category_ids = set()
+    chunk = []
+
+    def flush():
+        try:
+            result = apply_chunk(db, chunk)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            message = str(getattr(e, "orig", e)).splitlines()[0]
+            for row_number, _ in chunk:
+                _add_error(report, row_number, [f"Database error: {message}"])
+        else:
+            for row_number, message in result["errors"]:
+                _add_error(report, row_number, [message])
+            report.inserted += result["inserted"]
+            report.updated += result["updated"]
+            recipe_ids.update(result["recipe_ids"])
+            category_ids.update(result["category_ids"])
+        chunk.clear()
+
+    for row_number, data, error in _iter_rows(file, fmt):
+        report.processed += 1
+        if error:
+            _add_error(report, row_number, [error])
+            continue
+        try:
+            chunk.append((row_number, row_schema.model_validate(data)))
+        except ValidationError as e:
+            _add_error(report, row_number, _validation_messages(e))
+            continue
+        if len(chunk) >= settings.CATALOG_IMPORT_CHUNK_SIZE:
+            flush()
+
+    if chunk:
+        flush()
+
+    if catalog and (report.inserted or report.updated):
+        report.catalog_version = notify_catalog_change(recipe_ids, category_ids)
+    return report
+
+
+def _apply_recipe_chunk(db: Session, chunk) -> dict:
+    """Insert rows without id and update rows with id, using batched statements"""
+    ids = {row.id for _, row in chunk if row.id is not None}
+    referenced_categories = {row.category_id for _, row in chunk}
+
+    existing_ids = {
+        recipe_id for (recipe_id,) in db.query(Recipe.id).filter(Recipe.id.in_(ids))
+    } if ids else set()
+    existing_categories = {
+        category_id for (category_id,) in db.query(Category.id).filter(Category.id.in_(referenced_categories))
+    }
+
+    errors = []
+    inserts = []
+    updates = []
+    for row_number, row in chunk:
+        if row.category_id not in existing_categories:
+            errors.append((row_number, f"category_id: Category {row.category_id} does not exist"))
+            continue
+        if row.id is not None and row.id not in existing_ids:
+            errors.append((row_number, f"id: Recipe {row.id} does not exist"))
+            continue
+        if row.id is None:
+            values = row.model_dump()
+            values.pop("id")
+            inserts.append(values)
+        else:
+            # Only the columns present in the upload - the rest of the recipe is kept
+            updates.append({**row.model_dump(exclude_unset=True), "id": row.id})
+
+    if inserts:
+        db.execute(insert(Recipe), inserts)
+
+    # Batched UPDATE needs the same columns in every row, so group rows by column set
+    updates_by_columns = {}
+    for values in updates:
+        updates_by_columns.setdefault(frozenset(values), []).append(values)
+    for rows in updates_by_columns.values():
+        db.execute(update(Recipe), rows)
+
+    return {
+        "errors": errors,
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "recipe_ids": {values["id"] for values in updates},
+        "category_ids": {values["category_id"] for values in inserts + updates},
+    }
+
+
+CATEGORY_IMPORT_COLUMNS = ["description", "image_url", "is_active", "display_order"]
+
+
+def _apply_category_chunk(db: Session, chunk) -> dict:
+    """Upsert categories by their unique name, updating only the columns each row provides"""
+    # Later rows for the same name win; one statement can't touch a row twice
+    rows = {row.name: row for _, row in chunk}
+
+    existing = dict(db.query(Category.name, Category.id).filter(Category.name.in_(rows.keys())).all())
+
+    # New rows get the schema defaults; existing rows keep the columns the upload leaves out.
+    # A batched upsert updates the same columns for every row, so group rows by column set
+    rows_by_columns = {}
+    for row in rows.values():
+        columns = tuple(column for column in CATEGORY_IMPORT_COLUMNS if column in row.model_fields_set)
+        rows_by_columns.setdefault(columns, []).append(row.model_dump())
+    for columns, values in rows_by_columns.items():
+        if columns:
+            upsert(db.connection(), Category, values, "name", list(columns))
+        else:
+            insert_ignore(db.connection(), Category, values, "name")
+
+    updated = sum(1 for name in rows if name in existing)
+    return {
+        "errors": [],
+        "inserted": len(rows) - updated,
+        "updated": updated,
+        "recipe_ids": set(),
+        "category_ids": set(existing.values()),
+    }
+
+
+def _apply_user_chunk(db: Session, chunk) -> dict:
+    """Insert new users, skipping rows whose name or email is already taken"""
+    errors = []
+    rows = []
+    seen = {}
+    for row_number, row in chunk:
+        duplicate = seen.get(("name", row.name)) or seen.get(("email", row.email))
+        if duplicate:
+            errors.append((row_number, f"Duplicate name or email of row {duplicate} in this file"))
+            continue
+        seen[("name", row.name)] = seen[("email", row.email)] = row_number
+        rows.append((row_number, row))
+
+    # bcrypt dominates the import, so hash the whole chunk in parallel
+    hashes = hash_passwords([row.password for _, row in rows])
+    values = []
+    for (_, row), password_hash in zip(rows, hashes):
+        user = row.model_dump(exclude={"password"})
+        user["password_hash"] = password_hash
+        values.append(user)
+
+    inserted = {
+        email for (email,) in insert_ignore(db.connection(), UserModel, values, returning=["email"])
+    }
+    for row_number, row in rows:
+        if row.email not in inserted:
+            errors.append((row_number, "A user with this name or email already exists"))
+
+    return {
+        "errors": errors,
+        "inserted": len(inserted),
+        "updated": 0,
+        "recipe_ids": set(),
+        "category_ids": set(),
+    }
+
+
+@router.post("/catalog/recipes/import", response_model=ImportReport)
+def import_recipes(
+    file: UploadFile = File(..., description="CSV or NDJSON file of recipes"),
+    format: Optional[str] = Query(None, description="csv or ndjson (detected from the filename if omitted)"),
+    current_user: TokenPrincipal = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Bulk insert / update recipes from a streamed CSV or NDJSON upload"""
+    return _run_import(file, _detect_format(file, format), RecipeImportRow, _apply_recipe_chunk, db)
+
+
+@router.post("/catalog/categories/import", response_model=ImportReport)
+def import_categories(
+    file: UploadFile = File(..., description="CSV or NDJSON file of categories"),
+    format: Optional[str] = Query(None, description="csv or ndjson (detected from the filename if omitted)"),
+    current_user: TokenPrincipal = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Bulk upsert categories (matched by name) from a streamed CSV or NDJSON upload"""
+    return _run_import(file, _detect_format(file, format), CategoryImportRow, _apply_category_chunk, db)
+
+
+@router.post("/users/import", response_model=ImportReport)
+def import_users(
+    file: UploadFile = File(..., description="CSV or NDJSON file of users with plain-text passwords"),
+    format: Optional[str] = Query(None, description="csv or ndjson (detected from the filename if omitted)"),
+    current_user: TokenPrincipal = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Bulk create users from a streamed CSV or NDJSON upload, reporting name/email conflicts per row"""
+    return _run_import(file, _detect_format(file, format), UserImportRow, _apply_user_chunk, db, catalog=False)
+
+
+@router.put("/users/{user_id}/active", response_model=UserResponseSchema)
+def set_user_active(
+    user_id: int,
+    body: UserActiveUpdate,
+    current_user: TokenPrincipal = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Activate or deactivate a user; deactivating revokes every token issued to the user so far"""
+    columns = [getattr(UserModel, column) for column in USER_PUBLIC_COLUMNS]
+    user = db.execute(
+        update(UserModel).where(UserModel.id == user_id).values(is_active=body.is_active).returning(*columns)
+    ).first()
+    if user is None:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    # The flag change and the token cutoff commit together; a reactivated
+    # user logs in again, tokens from before the deactivation stay revoked
+    if not body.is_active:
+        revoke_user(db, user_id)
+    db.commit()
+    return UserResponseSchema.model_validate(user)
+
+
+@router.get("/export/{dataset}")
+def export_dataset(
+    dataset: ExportDataset,
+    compress: bool = Query(False, description="Gzip the NDJSON stream"),
+    current_user: TokenPrincipal = Depends(get_current_admin_user)
+):
+    """Stream a full dump of recipes, categories, orders (with items) or users as NDJSON"""
+    filename = f"{dataset.value}.ndjson" + (".gz" if compress else "")
+    return StreamingResponse(
+        stream_export(dataset.value, compress=compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/maintenance/cart-purge", response_model=CartPurgeMetrics)
+def cart_purge_metrics(current_user: TokenPrincipal = Depends(get_current_admin_user)):
+    """Abandoned cart purge counters for this worker"""
+    return cart_purger.metrics()
+
+
+@router.post("/maintenance/cart-purge", response_model=CartPurgeMetrics)
+def run_cart_purge(current_user: TokenPrincipal = Depends(get_current_admin_user)):
+    """Purge stale and unavailable cart items now, in the same throttled batches as the background task"""
+    cart_purger.run_once()
+    return cart_purger.metrics()
+
+
+@router.get("/maintenance/route-cache", response_model=RouteCacheMetrics)
+def route_cache_metrics(current_user: TokenPrincipal = Depends(get_current_admin_user)):
+    """Route cache hit, miss and coalesce counters for this worker"""
+    return route_cache.metrics()
+
+
+@router.delete("/maintenance/route-cache", response_model=RouteCacheMetrics)
+def clear_route_cache(current_user: TokenPrincipal = Depends(get_current_admin_user)):
+    """Drop every cached route response on this worker"""
+    route_cache.clear()
+    return route_cache.metrics()
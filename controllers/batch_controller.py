@@ -0,0 +1,125 @@
+import asyncio
+import json
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Request, status
+from starlette.concurrency import run_in_threadpool
+from serializers.batch_serializers import BatchRequest, BatchSubRequest, BatchSubResponse, BatchResponse
+from utils.tokens import authenticate_access_token
+from config.enviroment import settings
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+# Client headers passed on to every call (rate limiting keys on them)
+FORWARDED_HEADERS = (b"authorization", b"user-agent", b"x-forwarded-for")
+
+
+class _StreamingResponse(Exception):
+    """Raised from send() to stop a streaming call instead of buffering all of it"""
+
+
+def _not_batchable(sub_request: BatchSubRequest, reason: str) -> BatchSubResponse:
+    return BatchSubResponse(
+        id=sub_request.id,
+        status=status.HTTP_406_NOT_ACCEPTABLE,
+        body={"detail": f"{reason} - call {sub_request.path} directly"}
+    )
+
+
+async def _dispatch(request: Request, sub_request: BatchSubRequest, principal) -> BatchSubResponse:
+    """Run one call through the app in-process and capture its response"""
+    url = urlsplit(sub_request.path)
+    headers = [(key, value) for key, value in request.scope["headers"] if key in FORWARDED_HEADERS]
+    headers.append((b"accept", b"application/json"))
+    body = b""
+    if sub_request.body is not None:
+        body = json.dumps(sub_request.body).encode()
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": sub_request.method,
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": "",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "state": {"principal": principal} if principal else {},
+    }
+
+    body_sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Like a live connection: only disconnect once the call is over (streaming
+        # responses listen for it and would otherwise stop before sending anything)
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    response = {"status": 500, "headers": {}, "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {
+                key.decode("latin-1"): value.decode("latin-1")
+                for key, value in message.get("headers", [])
+                if key != b"content-length"
+            }
+        elif message["type"] == "http.response.body":
+            if message.get("more_body"):
+                # Exports and other streams can be any size - don't hold them in memory
+                raise _StreamingResponse()
+            response["body"] += message.get("body", b"")
+
+    try:
+        await request.app(scope, receive, send)
+    except _StreamingResponse:
+        return _not_batchable(sub_request, "Streaming responses can't be batched")
+    finally:
+        finished.set()
+
+    content = None
+    if response["body"]:
+        if not response["headers"].get("content-type", "").startswith("application/json"):
+            return _not_batchable(sub_request, "Only JSON responses can be batched")
+        try:
+            content = json.loads(response["body"])
+        except ValueError:
+            return _not_batchable(sub_request, "The response is not valid JSON")
+    return BatchSubResponse(
+        id=sub_request.id,
+        status=response["status"],
+        headers=response["headers"],
+        body=content
+    )
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(batch: BatchRequest, request: Request):
+    """Run several API calls concurrently in one round trip, authenticating once"""
+
+    # Authenticate once for the whole batch; calls without a token run anonymously
+    principal = None
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        # Off the event loop: a revocation check may hit the database
+        principal = await run_in_threadpool(authenticate_access_token, authorization[7:].strip())
+
+    semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+
+    async def run(sub_request: BatchSubRequest) -> BatchSubResponse:
+        async with semaphore:
+            return await _dispatch(request, sub_request, principal)
+
+    # Each call goes through the full middleware stack, so it is rate limited and load shed on its own
+    responses = await asyncio.gather(*(run(sub_request) for sub_request in batch.requests))
+    return BatchResponse(responses=responses)
@@ -1,17 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, func, update
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
-from typing import List
+from typing import List, Optional
 from decimal import Decimal
+from datetime import datetime, timezone
 from database import get_db
 from models.cart import CartItem
 from models.recipe import Recipe
-from models.user import UserModel
-from serializers.cart_serializers import CartItemCreate, CartItemUpdate, CartItemResponseSchema, CartResponseSchema
-from dependencies.auth import get_current_user
+from serializers.recipe_serializers import RecipeResponseSchema
+from serializers.cart_serializers import CartItemCreate, CartItemUpdate, CartItemResponseSchema, CartResponseSchema, CartBulkUpdate, CartSummarySchema
+from dependencies.auth import get_current_principal
+from utils.tokens import TokenPrincipal
+from utils.bulk import upsert, upsert_statement
+from utils.fields import sparse_fields, loader_options, sparse_response, with_paths
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
+CART_ITEM_COLUMNS = [CartItem.id, CartItem.user_id, CartItem.recipe_id, CartItem.number_of_people, CartItem.created_at, CartItem.updated_at]
+
 def _create_cart_item_response(cart_item: CartItem) -> CartItemResponseSchema:
     """Helper function to create cart item response with calculated price"""
     calculated_price = cart_item.recipe.base_price * Decimal(cart_item.number_of_people)
@@ -22,45 +29,173 @@ def _create_cart_item_response(cart_item: CartItem) -> CartItemResponseSchema:
     
     return response
 
+def _cart_item_response_from_row(row, recipe: RecipeResponseSchema) -> CartItemResponseSchema:
+    """Cart item response from a RETURNING row and an already loaded recipe"""
+    return CartItemResponseSchema(
+        **row._mapping,
+        recipe=recipe,
+        calculated_price=recipe.base_price * Decimal(row.number_of_people)
+    )
+
+def _load_recipe_response(db: Session, recipe_id: int, available_only: bool = True) -> Optional[RecipeResponseSchema]:
+    query = db.query(Recipe).options(joinedload(Recipe.category)).filter(Recipe.id == recipe_id)
+    if available_only:
+        query = query.filter(Recipe.is_available == True)
+    recipe = query.first()
+    return RecipeResponseSchema.model_validate(recipe) if recipe else None
+
+def _cart_summary(db: Session, user_id: int) -> CartSummarySchema:
+    """Item count, people and amount for a user's cart from one aggregate query"""
+    
+    total_items, total_people, total_amount = db.query(
+        func.count(CartItem.id),
+        func.coalesce(func.sum(CartItem.number_of_people), 0),
+        func.coalesce(func.sum(Recipe.base_price * CartItem.number_of_people), 0),
+    ).join(Recipe, Recipe.id == CartItem.recipe_id).filter(CartItem.user_id == user_id).one()
+    
+    return CartSummarySchema(
+        total_items=total_items,
+        total_people=total_people,
+        total_amount=Decimal(str(total_amount)).quantize(Decimal('0.01'))
+    )
+
+def _build_cart_response(db: Session, user_id: int) -> CartResponseSchema:
+    """Load a user's cart with recipes, totals come from the SQL aggregate"""
+    
+    cart_items = db.query(CartItem).options(
+        joinedload(CartItem.recipe).joinedload(Recipe.category)
+    ).filter(CartItem.user_id == user_id).all()
+    
+    summary = _cart_summary(db, user_id)
+    
+    return CartResponseSchema(
+        items=[_create_cart_item_response(cart_item) for cart_item in cart_items],
+        total_amount=summary.total_amount,
+        total_items=summary.total_items
+    )
+
+def _sparse_cart_response(db: Session, user_id: int, fields: dict):
+    """Cart with only the selected fields; items and totals are only queried when selected"""
+    
+    cart = {}
+    item_fields = fields.get("items")
+    if item_fields:
+        # calculated_price needs the people count and base price even when they aren't returned
+        load_fields = with_paths(item_fields, "number_of_people", "recipe.base_price") if "calculated_price" in item_fields else item_fields
+        cart_items = db.query(CartItem).options(*loader_options(CartItem, load_fields)).filter(
+            CartItem.user_id == user_id
+        ).order_by(CartItem.id).all()
+        cart["items"] = []
+        for cart_item in cart_items:
+            item = {name: getattr(cart_item, name) for name in item_fields if name != "calculated_price"}
+            if "calculated_price" in item_fields:
+                item["calculated_price"] = cart_item.recipe.base_price * Decimal(cart_item.number_of_people)
+            cart["items"].append(item)
+    
+    if "total_amount" in fields or "total_items" in fields:
+        summary = _cart_summary(db, user_id)
+        cart["total_amount"] = summary.total_amount
+        cart["total_items"] = summary.total_items
+    
+    return sparse_response(CartResponseSchema, fields, cart)
+
 @router.get("/", response_model=CartResponseSchema)
 def get_user_cart(
-    current_user: UserModel = Depends(get_current_user),
+    fields: Optional[dict] = Depends(sparse_fields(CartResponseSchema)),
+    current_user: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    """Get current user's cart items"""
+    """Get current user's cart items, optionally only some fields (e.g. items.recipe.name,total_amount)"""
     
-    cart_items = db.query(CartItem).options(
-        joinedload(CartItem.recipe).joinedload(Recipe.category)
-    ).filter(CartItem.user_id == current_user.id).all()
+    if fields:
+        return _sparse_cart_response(db, current_user.id, fields)
+    return _build_cart_response(db, current_user.id)
+
+@router.get("/summary", response_model=CartSummarySchema)
+def get_cart_summary(
+    current_user: TokenPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Get item count, total people and total amount without loading the items"""
     
-    # Calculate totals and prepare response
-    total_amount = Decimal('0.00')
-    cart_item_responses = []
+    return _cart_summary(db, current_user.id)
+
+@router.patch("", response_model=CartResponseSchema)
+def bulk_update_cart(
+    cart_update: CartBulkUpdate,
+    current_user: TokenPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Apply a list of set / remove / clear operations in one transaction"""
     
-    for cart_item in cart_items:
-        cart_response = _create_cart_item_response(cart_item)
-        total_amount += cart_response.calculated_price
-        cart_item_responses.append(cart_response)
+    # Collapse the operations, in order, into the final change set
+    clear_all = False
+    changes = {}  # recipe_id -> number_of_people, or None to remove
+    for operation in cart_update.operations:
+        if operation.op == "clear":
+            clear_all = True
+            changes.clear()
+        elif operation.op == "set":
+            changes[operation.recipe_id] = operation.number_of_people
+        else:
+            changes[operation.recipe_id] = None
     
-    return CartResponseSchema(
-        items=cart_item_responses,
-        total_amount=total_amount,
-        total_items=len(cart_item_responses)
-    )
+    to_set = {recipe_id: people for recipe_id, people in changes.items() if people is not None}
+    to_remove = [recipe_id for recipe_id, people in changes.items() if people is None]
+    
+    # Validate every referenced recipe with one query
+    if to_set:
+        available = {
+            recipe_id for (recipe_id,) in db.query(Recipe.id).filter(
+                Recipe.id.in_(to_set.keys()),
+                Recipe.is_available == True
+            )
+        }
+        missing = sorted(set(to_set) - available)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Recipes not found or not available: {missing}"
+            )
+    
+    now = datetime.now(timezone.utc)
+    try:
+        if clear_all:
+            db.execute(delete(CartItem).where(CartItem.user_id == current_user.id))
+        elif to_remove:
+            db.execute(delete(CartItem).where(
+                CartItem.user_id == current_user.id,
+                CartItem.recipe_id.in_(to_remove)
+            ))
+        upsert(db.connection(), CartItem, [
+            {
+                "user_id": current_user.id,
+                "recipe_id": recipe_id,
+                "number_of_people": people,
+                "updated_at": now,
+            }
+            for recipe_id, people in to_set.items()
+        ], ["user_id", "recipe_id"], ["number_of_people", "updated_at"])
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error updating cart"
+        )
+    
+    return _build_cart_response(db, current_user.id)
 
 @router.post("/add", response_model=CartItemResponseSchema)
 def add_item_to_cart(
     cart_item_data: CartItemCreate,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Add recipe to cart or update quantity if already exists"""
     
-    # Check if recipe exists and is available
-    recipe = db.query(Recipe).filter(
-        Recipe.id == cart_item_data.recipe_id,
-        Recipe.is_available == True
-    ).first()
+    # Check if recipe exists and is available (loaded once, reused for the response)
+    recipe = _load_recipe_response(db, cart_item_data.recipe_id)
     
     if not recipe:
         raise HTTPException(
@@ -68,76 +203,58 @@ def add_item_to_cart(
             detail="Recipe not found or not available"
         )
     
-    # Check if item already exists in cart
-    existing_cart_item = db.query(CartItem).filter(
-        CartItem.user_id == current_user.id,
-        CartItem.recipe_id == cart_item_data.recipe_id
-    ).first()
-    
-    if existing_cart_item:
-        # Update existing item
-        existing_cart_item.number_of_people = cart_item_data.number_of_people
+    # Insert or update the item in one statement, returning the stored row
+    stmt = upsert_statement(db.connection(), CartItem, ["user_id", "recipe_id"], ["number_of_people", "updated_at"])
+    try:
+        cart_item = db.execute(stmt.returning(*CART_ITEM_COLUMNS), {
+            "user_id": current_user.id,
+            "recipe_id": cart_item_data.recipe_id,
+            "number_of_people": cart_item_data.number_of_people,
+            "updated_at": datetime.now(timezone.utc),
+        }).one()
         db.commit()
-        cart_item = existing_cart_item
-    else:
-        # Create new cart item
-        cart_item = CartItem(
-            user_id=current_user.id,
-            recipe_id=cart_item_data.recipe_id,
-            number_of_people=cart_item_data.number_of_people
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error adding item to cart"
         )
-        
-        db.add(cart_item)
-        try:
-            db.commit()
-            db.refresh(cart_item)
-        except IntegrityError:
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Error adding item to cart"
-            )
-    
-    # Load with relationships for response
-    cart_item_with_recipe = db.query(CartItem).options(
-        joinedload(CartItem.recipe).joinedload(Recipe.category)
-    ).filter(CartItem.id == cart_item.id).first()
     
-    return _create_cart_item_response(cart_item_with_recipe)
+    return _cart_item_response_from_row(cart_item, recipe)
 
 @router.put("/item/{cart_item_id}", response_model=CartItemResponseSchema)
 def update_cart_item(
     cart_item_id: int,
     cart_item_update: CartItemUpdate,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Update cart item quantity"""
     
-    cart_item = db.query(CartItem).options(
-        joinedload(CartItem.recipe).joinedload(Recipe.category)
-    ).filter(
-        CartItem.id == cart_item_id,
-        CartItem.user_id == current_user.id
+    # Update the item, returning the stored row
+    cart_item = db.execute(
+        update(CartItem).where(
+            CartItem.id == cart_item_id,
+            CartItem.user_id == current_user.id
+        ).values(number_of_people=cart_item_update.number_of_people).returning(*CART_ITEM_COLUMNS)
     ).first()
     
     if not cart_item:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cart item not found"
         )
     
-    # Update the item
-    cart_item.number_of_people = cart_item_update.number_of_people
+    recipe = _load_recipe_response(db, cart_item.recipe_id, available_only=False)
     db.commit()
-    db.refresh(cart_item)
     
-    return _create_cart_item_response(cart_item)
+    return _cart_item_response_from_row(cart_item, recipe)
 
 @router.delete("/item/{cart_item_id}")
 def remove_cart_item(
     cart_item_id: int,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Remove item from cart"""
@@ -160,7 +277,7 @@ def remove_cart_item(
 
 @router.delete("/clear")
 def clear_cart(
-    current_user: UserModel = Depends(get_current_user),
+    current_user: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Clear all items from user's cart"""
@@ -4,10 +4,12 @@ from typing import List
 from database import get_db
 from models.category import Category
 from serializers.category_serializers import CategoryResponseSchema, CategoryWithRecipes
+from utils.route_cache import cached_route
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 @router.get("/", response_model=List[CategoryResponseSchema])
+@cached_route()
 def get_all_categories(db: Session = Depends(get_db)):
     """Get all active categories ordered by display_order"""
     
@@ -18,6 +20,7 @@ def get_all_categories(db: Session = Depends(get_db)):
     return [CategoryResponseSchema.model_validate(category) for category in categories]
 
 @router.get("/{category_id}", response_model=CategoryResponseSchema)
+@cached_route()
 def get_category_by_id(category_id: int, db: Session = Depends(get_db)):
     """Get specific category by ID"""
     
@@ -35,6 +38,7 @@ def get_category_by_id(category_id: int, db: Session = Depends(get_db)):
     return CategoryResponseSchema.model_validate(category)
 
 @router.get("/{category_id}/recipes", response_model=List[dict])
+@cached_route()
 def get_recipes_by_category(category_id: int, db: Session = Depends(get_db)):
     """Get all available recipes in a specific category"""
     
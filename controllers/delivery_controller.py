@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List
+from database import get_db
+from serializers.delivery_serializers import DeliverySlotSchema
+from utils.delivery import slot_scheduler
+from config.enviroment import settings
+
+router = APIRouter(prefix="/delivery", tags=["delivery"])
+
+@router.get("/slots", response_model=List[DeliverySlotSchema])
+def get_delivery_slots(
+    hours: int = Query(24, ge=1, le=settings.DELIVERY_HORIZON_HOURS, description="How many hours ahead to list"),
+    db: Session = Depends(get_db)
+):
+    """Upcoming delivery windows with their remaining capacity"""
+    
+    return [DeliverySlotSchema.model_validate(slot) for slot in slot_scheduler.availability(db, hours)]
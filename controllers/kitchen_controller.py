@@ -0,0 +1,135 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session, joinedload
+from typing import List
+from datetime import datetime, timedelta, timezone
+import secrets
+from database import get_db
+from models.order import Order, OrderItem
+from models.recipe import Recipe
+from serializers.order_serializers import KitchenClaimRequest, KitchenLease, KitchenOrderSchema, OrderStatus
+from dependencies.auth import get_current_admin_user
+from utils.tokens import TokenPrincipal
+from config.enviroment import settings
+
+router = APIRouter(prefix="/kitchen", tags=["kitchen"])
+
+def _claimable(now: datetime):
+    """Confirmed orders, plus orders whose prep station let the lease run out"""
+    return or_(
+        Order.status == OrderStatus.CONFIRMED.value,
+        and_(
+            Order.status == OrderStatus.PREPARING.value,
+            Order.lease_token.isnot(None),
+            Order.lease_expires_at < now
+        )
+    )
+
+def _load_orders(db: Session, *criteria) -> List[Order]:
+    return db.query(Order).options(
+        joinedload(Order.order_items).joinedload(OrderItem.recipe).joinedload(Recipe.category)
+    ).filter(*criteria).order_by(Order.order_date.asc(), Order.id.asc()).all()
+
+def _get_leased_order(db: Session, order_id: int, lease: KitchenLease) -> Order:
+    order = db.query(Order).filter(
+        Order.id == order_id,
+        Order.status == OrderStatus.PREPARING.value,
+        Order.lease_token == lease.lease_token
+    ).with_for_update().first()
+    
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Order is not claimed with this lease"
+        )
+    
+    return order
+
+@router.post("/claim", response_model=List[KitchenOrderSchema])
+def claim_orders(
+    claim: KitchenClaimRequest,
+    current_user: TokenPrincipal = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Atomically claim the oldest confirmed orders and move them to preparing"""
+    
+    if claim.limit < 1 or claim.limit > settings.KITCHEN_CLAIM_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Limit must be between 1 and {settings.KITCHEN_CLAIM_MAX}"
+        )
+    
+    now = datetime.now(timezone.utc)
+    lease_token = secrets.token_hex(16)
+    
+    # Postgres: rows another station is claiming right now are skipped instead of
+    # waited on. SQLite renders no FOR UPDATE, but it runs one writer at a time
+    # so the single UPDATE below is just as atomic there.
+    candidates = select(Order.id).where(_claimable(now)).order_by(
+        Order.order_date.asc(), Order.id.asc()
+    ).limit(claim.limit).with_for_update(skip_locked=True)
+    
+    db.execute(
+        update(Order).where(
+            Order.id.in_(candidates.scalar_subquery()),
+            _claimable(now)
+        ).values(
+            status=OrderStatus.PREPARING.value,
+            claimed_by=claim.station,
+            lease_token=lease_token,
+            lease_expires_at=now + timedelta(seconds=settings.KITCHEN_LEASE_SECONDS)
+        ).execution_options(synchronize_session=False)
+    )
+    db.commit()
+    
+    return [KitchenOrderSchema.model_validate(order) for order in _load_orders(db, Order.lease_token == lease_token)]
+
+@router.post("/orders/{order_id}/heartbeat", response_model=KitchenOrderSchema)
+def extend_lease(
+    order_id: int,
+    lease: KitchenLease,
+    current_user: TokenPrincipal = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Keep a claimed order from being re-queued while it is still being prepared"""
+    
+    order = _get_leased_order(db, order_id, lease)
+    order.lease_expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.KITCHEN_LEASE_SECONDS)
+    db.commit()
+    
+    return KitchenOrderSchema.model_validate(_load_orders(db, Order.id == order_id)[0])
+
+@router.post("/orders/{order_id}/complete", response_model=KitchenOrderSchema)
+def complete_order(
+    order_id: int,
+    lease: KitchenLease,
+    current_user: TokenPrincipal = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Finish preparing a claimed order and hand it to delivery"""
+    
+    order = _get_leased_order(db, order_id, lease)
+    order.status = OrderStatus.OUT_FOR_DELIVERY.value
+    order.lease_token = None
+    order.lease_expires_at = None
+    db.commit()
+    
+    return KitchenOrderSchema.model_validate(_load_orders(db, Order.id == order_id)[0])
+
+@router.post("/orders/{order_id}/release", response_model=KitchenOrderSchema)
+def release_order(
+    order_id: int,
+    lease: KitchenLease,
+    current_user: TokenPrincipal = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Give a claimed order back to the queue for another station"""
+    
+    order = _get_leased_order(db, order_id, lease)
+    order.status = OrderStatus.CONFIRMED.value
+    order.claimed_by = None
+    order.lease_token = None
+    order.lease_expires_at = None
+    db.commit()
+    
+    return KitchenOrderSchema.model_validate(_load_orders(db, Order.id == order_id)[0])
@@ -1,36 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, func, insert, update
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import List, Optional
 from decimal import Decimal
-from datetime import datetime, timedelta
 from database import get_db
 from models.order import Order, OrderItem
 from models.cart import CartItem
 from models.recipe import Recipe
-from models.user import UserModel
-from serializers.order_serializers import OrderCreate, OrderResponseSchema, OrderSummarySchema, OrderStatus
-from dependencies.auth import get_current_user
+from serializers.order_serializers import OrderCreate, OrderResponseSchema, OrderItemResponseSchema, OrderSummarySchema, OrderStatus
+from serializers.recipe_serializers import RecipeResponseSchema
+from dependencies.auth import get_current_principal
+from utils.tokens import TokenPrincipal
+from utils.related import related_recipes
+from utils.popularity import popularity
+from utils.delivery import slot_scheduler
+from utils.fields import sparse_fields, loader_options, sparse_response
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 @router.post("/", response_model=OrderResponseSchema, status_code=status.HTTP_201_CREATED)
 def create_order(
     order_data: OrderCreate,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Create new order from cart items or provided items"""
     
+    # Load every referenced recipe (with category, for the response) in one query
+    recipe_ids = {item.recipe_id for item in order_data.items}
+    recipes = {
+        recipe.id: RecipeResponseSchema.model_validate(recipe)
+        for recipe in db.query(Recipe).options(joinedload(Recipe.category)).filter(
+            Recipe.id.in_(recipe_ids),
+            Recipe.is_available == True
+        )
+    }
+    
     total_amount = Decimal('0.00')
     order_items_data = []
     
     # Process each item in the order
     for item in order_data.items:
-        # Get recipe and verify availability
-        recipe = db.query(Recipe).filter(
-            Recipe.id == item.recipe_id,
-            Recipe.is_available == True
-        ).first()
+        recipe = recipes.get(item.recipe_id)
         
         if not recipe:
             raise HTTPException(
@@ -50,50 +61,84 @@ def create_order(
             'calculated_price': calculated_price
         })
     
-    # Create order
-    order = Order(
+    # Book the earliest delivery window with room, in this transaction
+    slot = slot_scheduler.book(db)
+    
+    if not slot:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No delivery slots available, please try again later"
+        )
+    
+    # Create order, returning the stored row
+    order = db.execute(insert(Order).values(
         user_id=current_user.id,
         total_amount=total_amount,
         delivery_address=order_data.delivery_address,
         delivery_phone=order_data.delivery_phone,
         special_notes=order_data.special_notes,
-        estimated_delivery=datetime.utcnow() + timedelta(hours=2)  # 2 hours from now
-    )
-    
-    db.add(order)
-    db.commit()
-    db.refresh(order)
+        delivery_slot_id=slot.id,
+        estimated_delivery=slot.ends_at
+    ).returning(*Order.__table__.c)).one()
     
-    # Create order items
-    for item_data in order_items_data:
-        order_item = OrderItem(
-            order_id=order.id,
-            **item_data
-        )
-        db.add(order_item)
-    
-    db.commit()
+    # Create order items in one batched INSERT ... RETURNING
+    order_items = sorted(db.execute(
+        insert(OrderItem).returning(*OrderItem.__table__.c),
+        [{'order_id': order.id, **item_data} for item_data in order_items_data]
+    ).all(), key=lambda order_item: order_item.id)
     
     # Clear user's cart after successful order
-    db.query(CartItem).filter(CartItem.user_id == current_user.id).delete()
+    db.execute(delete(CartItem).where(CartItem.user_id == current_user.id))
     db.commit()
     
-    # Reload order with all relationships
-    order_with_items = db.query(Order).options(
-        joinedload(Order.order_items).joinedload(OrderItem.recipe).joinedload(Recipe.category)
-    ).filter(Order.id == order.id).first()
+    related_recipes.record_order(item['recipe_id'] for item in order_items_data)
+    popularity.record_order(
+        [(item['recipe_id'], recipes[item['recipe_id']].category_id) for item in order_items_data],
+        order.order_date
+    )
     
-    return OrderResponseSchema.model_validate(order_with_items)
+    # Response from the returned rows and the recipes loaded above
+    return OrderResponseSchema(
+        **order._mapping,
+        order_items=[
+            OrderItemResponseSchema(**order_item._mapping, recipe=recipes[order_item.recipe_id])
+            for order_item in order_items
+        ]
+    )
 
 @router.get("/", response_model=List[OrderSummarySchema])
 def get_user_orders(
-    current_user: UserModel = Depends(get_current_user),
+    current_user: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    fields: Optional[dict] = Depends(sparse_fields(OrderSummarySchema))
 ):
     """Get current user's order history"""
     
+    if fields:
+        orders = db.query(Order).options(*loader_options(Order, fields)).filter(
+            Order.user_id == current_user.id
+        ).order_by(
+            Order.order_date.desc()
+        ).offset(skip).limit(limit).all()
+        
+        # Item counts with one grouped query, only when selected
+        counts = {}
+        if "items_count" in fields and orders:
+            counts = dict(db.query(OrderItem.order_id, func.count(OrderItem.id)).filter(
+                OrderItem.order_id.in_([order.id for order in orders])
+            ).group_by(OrderItem.order_id).all())
+        
+        return sparse_response(OrderSummarySchema, fields, [
+            {
+                **{name: getattr(order, name) for name in fields if name != "items_count"},
+                "items_count": counts.get(order.id, 0),
+            }
+            for order in orders
+        ])
+    
     orders = db.query(Order).options(
         joinedload(Order.order_items)
     ).filter(
@@ -118,14 +163,16 @@ def get_user_orders(
 @router.get("/{order_id}", response_model=OrderResponseSchema)
 def get_order_details(
     order_id: int,
-    current_user: UserModel = Depends(get_current_user),
+    fields: Optional[dict] = Depends(sparse_fields(OrderResponseSchema)),
+    current_user: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get detailed information about a specific order"""
     
-    order = db.query(Order).options(
+    options = loader_options(Order, fields) if fields else [
         joinedload(Order.order_items).joinedload(OrderItem.recipe).joinedload(Recipe.category)
-    ).filter(
+    ]
+    order = db.query(Order).options(*options).filter(
         Order.id == order_id,
         Order.user_id == current_user.id
     ).first()
@@ -136,18 +183,23 @@ def get_order_details(
             detail="Order not found"
         )
     
+    if fields:
+        return sparse_response(OrderResponseSchema, fields, order)
     return OrderResponseSchema.model_validate(order)
 
 @router.put("/{order_id}/status", response_model=OrderResponseSchema)
 def update_order_status(
     order_id: int,
     new_status: OrderStatus,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Update order status (for admin or delivery updates)"""
     
-    order = db.query(Order).filter(
+    # Load the order with everything the response needs up front
+    order = db.query(Order).options(
+        joinedload(Order.order_items).joinedload(OrderItem.recipe).joinedload(Recipe.category)
+    ).filter(
         Order.id == order_id,
         Order.user_id == current_user.id
     ).first()
@@ -174,12 +226,37 @@ def update_order_status(
             detail=f"Cannot change status from {order.status} to {new_status.value}"
         )
     
-    order.status = new_status.value
+    # Compare-and-set, so a concurrent change (e.g. a kitchen claim) isn't overwritten
+    changed = db.execute(
+        update(Order).where(
+            Order.id == order.id,
+            Order.status == order.status
+        ).values(status=new_status.value).execution_options(synchronize_session=False)
+    ).rowcount
+    
+    if not changed:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Order status changed concurrently, please retry"
+        )
+    
+    # Build the response from the loaded order before commit expires it
+    response = OrderResponseSchema.model_validate(order)
+    response.status = new_status
+    cancelled_items = [(item.recipe_id, item.recipe.category_id) for item in order.order_items]
+    order_date = order.order_date
+    slot_id = order.delivery_slot_id
+    
+    # Cancelling frees the order's delivery window
+    released_slot = None
+    if new_status == OrderStatus.CANCELLED and slot_id:
+        released_slot = slot_scheduler.release(db, slot_id)
     db.commit()
     
-    # Reload with relationships
-    order_with_items = db.query(Order).options(
-        joinedload(Order.order_items).joinedload(OrderItem.recipe).joinedload(Recipe.category)
-    ).filter(Order.id == order.id).first()
+    if new_status == OrderStatus.CANCELLED:
+        popularity.record_order(cancelled_items, order_date, delta=-1)
+        if released_slot:
+            slot_scheduler.requeue(slot_id, released_slot)
     
-    return OrderResponseSchema.model_validate(order_with_items)
\ No newline at end of file
+    return response
\ No newline at end of file
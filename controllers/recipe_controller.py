@@ -1,31 +1,118 @@
+import threading
+from collections import OrderedDict
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from database import get_db
 from models.recipe import Recipe
 from models.category import Category
-from serializers.recipe_serializers import RecipeResponseSchema, RecipeWithPricing
+from serializers.recipe_serializers import RecipeResponseSchema, RecipeWithPricing, RecipeSearchResult, RelatedRecipe, RecipePricingMatrix, RecipeSort, PopularityWindow
+from utils.search import search_recipes
+from utils.related import related_recipes
+from utils.popularity import popularity
+from utils.fields import sparse_fields, loader_options, sparse_response
+from utils.route_cache import cached_route
+from utils.catalog_events import catalog_version
+from config.enviroment import settings
 
 router = APIRouter(prefix="/recipes", tags=["recipes"])
 
+POPULAR_SCAN_CHUNK = 500
+POPULAR_IN_CHUNK = 5000
+POPULAR_TAIL_CURSORS = 256
+PRICING_MAX_RECIPES = 200
+
+# Where the last popular-sort pages stopped in the unranked tail, so the next
+# page resumes from a (name, id) keyset cursor instead of rescanning from the
+# start: (catalog version, filter key, unranked rows consumed) -> (ranking, cursor)
+_tail_cursors_lock = threading.Lock()
+_tail_cursors = OrderedDict()
+
+def _tail_cursor(key: tuple, ranked: tuple) -> Optional[tuple]:
+    with _tail_cursors_lock:
+        entry = _tail_cursors.get(key)
+        if entry is None or entry[0] is not ranked:
+            return None
+        _tail_cursors.move_to_end(key)
+        return entry[1]
+
+def _store_tail_cursor(key: tuple, ranked: tuple, cursor: tuple):
+    with _tail_cursors_lock:
+        _tail_cursors[key] = (ranked, cursor)
+        _tail_cursors.move_to_end(key)
+        while len(_tail_cursors) > POPULAR_TAIL_CURSORS:
+            _tail_cursors.popitem(last=False)
+
+def _popular_recipe_ids(db: Session, filters: list, filter_key: tuple, ranked: tuple, skip: int, limit: int) -> List[int]:
+    """Ids for one page ordered by popularity; recipes without orders follow by name"""
+    
+    # Ranked recipes that still pass the filters, one IN query per chunk; the
+    # first chunk covers the page and later ones double up to POPULAR_IN_CHUNK
+    ids = []
+    start = 0
+    size = min(skip + limit, POPULAR_IN_CHUNK)
+    while start < len(ranked):
+        chunk = ranked[start:start + size]
+        passing = set(db.scalars(select(Recipe.id).where(*filters, Recipe.id.in_(chunk))))
+        ids.extend(recipe_id for recipe_id in chunk if recipe_id in passing)
+        if len(ids) >= skip + limit:
+            return ids[skip:skip + limit]
+        start += len(chunk)
+        size = min(size * 2, POPULAR_IN_CHUNK)
+    
+    # Unranked recipes by (name, id), resuming from a cursor when an earlier
+    # page stopped exactly where this one starts
+    to_skip = max(0, skip - len(ids))
+    ids = ids[skip:]
+    ranked_ids = set(ranked)
+    version = catalog_version()
+    cursor = _tail_cursor((version, filter_key, to_skip), ranked)
+    consumed = to_skip if cursor else 0
+    to_skip = 0 if cursor else to_skip
+    while len(ids) < limit:
+        query = select(Recipe.id, Recipe.name).where(*filters)
+        if cursor:
+            query = query.where(tuple_(Recipe.name, Recipe.id) > cursor)
+        batch = db.execute(query.order_by(Recipe.name.asc(), Recipe.id.asc()).limit(POPULAR_SCAN_CHUNK)).all()
+        if not batch:
+            break
+        for recipe_id, name in batch:
+            cursor = (name, recipe_id)
+            if recipe_id in ranked_ids:
+                continue
+            consumed += 1
+            if to_skip:
+                to_skip -= 1
+                continue
+            ids.append(recipe_id)
+            if len(ids) == limit:
+                break
+    
+    if cursor:
+        _store_tail_cursor((version, filter_key, consumed), ranked, cursor)
+    return ids
+
 @router.get("/", response_model=List[RecipeResponseSchema])
+@cached_route()
 def get_all_recipes(
     skip: int = Query(0, ge=0, description="Number of recipes to skip"),
     limit: int = Query(100, ge=1, le=100, description="Number of recipes to return"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     difficulty: Optional[str] = Query(None, description="Filter by difficulty level"),
+    sort: RecipeSort = Query(RecipeSort.NAME, description="Order by name or by number of orders"),
+    window: PopularityWindow = Query(PopularityWindow.WEEK, description="Time window for sort=popular"),
+    fields: Optional[dict] = Depends(sparse_fields(RecipeResponseSchema)),
     db: Session = Depends(get_db)
 ):
     """Get all available recipes with optional filtering"""
     
-    query = db.query(Recipe).options(joinedload(Recipe.category)).filter(
-        Recipe.is_available == True
-    )
+    filters = [Recipe.is_available == True]
     
     # Apply filters
     if category_id:
-        query = query.filter(Recipe.category_id == category_id)
+        filters.append(Recipe.category_id == category_id)
     
     if difficulty:
         if difficulty not in ['easy', 'medium', 'hard']:
@@ -33,18 +120,100 @@ def get_all_recipes(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Difficulty must be 'easy', 'medium', or 'hard'"
             )
-        query = query.filter(Recipe.difficulty == difficulty)
+        filters.append(Recipe.difficulty == difficulty)
+    
+    # Only load the selected columns (and the category only when selected)
+    query = db.query(Recipe).options(*(loader_options(Recipe, fields) if fields else [joinedload(Recipe.category)]))
     
-    # Apply pagination and ordering
-    recipes = query.order_by(Recipe.name.asc()).offset(skip).limit(limit).all()
+    if sort == RecipeSort.POPULAR:
+        ranked = popularity.ranking(window.value, category_id)
+        ids = _popular_recipe_ids(db, filters, (category_id, difficulty), ranked, skip, limit)
+        recipes_by_id = {recipe.id: recipe for recipe in query.filter(Recipe.id.in_(ids))}
+        recipes = [recipes_by_id[recipe_id] for recipe_id in ids if recipe_id in recipes_by_id]
+    else:
+        # Apply pagination and ordering
+        recipes = query.filter(*filters).order_by(Recipe.name.asc()).offset(skip).limit(limit).all()
     
+    if fields:
+        return sparse_response(RecipeResponseSchema, fields, recipes)
     return [RecipeResponseSchema.model_validate(recipe) for recipe in recipes]
 
+@router.get("/search", response_model=List[RecipeSearchResult])
+def search_all_recipes(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms, matched as prefixes against name and description"),
+    skip: int = Query(0, ge=0, description="Number of results to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over available recipes, most relevant first"""
+    
+    results = search_recipes(db, q, skip=skip, limit=limit, category_id=category_id)
+    
+    return [
+        RecipeSearchResult(**RecipeResponseSchema.model_validate(recipe).model_dump(), rank=rank)
+        for recipe, rank in results
+    ]
+
+@router.get("/pricing", response_model=RecipePricingMatrix)
+@cached_route()
+def get_pricing_matrix(
+    ids: str = Query(..., description="Comma separated recipe ids, e.g. 1,2,3"),
+    min_people: int = Query(1, ge=1, le=20, description="Smallest party size"),
+    max_people: int = Query(20, ge=1, le=20, description="Largest party size"),
+    db: Session = Depends(get_db)
+):
+    """Prices for many recipes at every party size in a range, from one query"""
+    
+    try:
+        recipe_ids = list(dict.fromkeys(int(recipe_id) for recipe_id in ids.split(",") if recipe_id.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma separated list of integers"
+        )
+    if not recipe_ids or len(recipe_ids) > PRICING_MAX_RECIPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Pass between 1 and {PRICING_MAX_RECIPES} recipe ids"
+        )
+    if min_people > max_people:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_people cannot be greater than max_people"
+        )
+    
+    # Only the base prices, in one query
+    base_prices = dict(db.query(Recipe.id, Recipe.base_price).filter(
+        Recipe.id.in_(recipe_ids),
+        Recipe.is_available == True
+    ).all())
+    
+    # Exact integer cents: each row is the base price times every party size
+    people = list(range(min_people, max_people + 1))
+    found = [recipe_id for recipe_id in recipe_ids if recipe_id in base_prices]
+    prices = []
+    for recipe_id in found:
+        cents = int((Decimal(base_prices[recipe_id]) * 100).to_integral_value(ROUND_HALF_UP))
+        prices.append([Decimal(cents * count).scaleb(-2) for count in people])
+    
+    return RecipePricingMatrix(
+        people=people,
+        recipe_ids=found,
+        prices=prices,
+        missing=[recipe_id for recipe_id in recipe_ids if recipe_id not in base_prices]
+    )
+
 @router.get("/{recipe_id}", response_model=RecipeResponseSchema)
-def get_recipe_by_id(recipe_id: int, db: Session = Depends(get_db)):
+@cached_route()
+def get_recipe_by_id(
+    recipe_id: int,
+    fields: Optional[dict] = Depends(sparse_fields(RecipeResponseSchema)),
+    db: Session = Depends(get_db)
+):
     """Get specific recipe with category information"""
     
-    recipe = db.query(Recipe).options(joinedload(Recipe.category)).filter(
+    recipe = db.query(Recipe).options(*(loader_options(Recipe, fields) if fields else [joinedload(Recipe.category)])).filter(
         Recipe.id == recipe_id,
         Recipe.is_available == True
     ).first()
@@ -55,8 +224,41 @@ def get_recipe_by_id(recipe_id: int, db: Session = Depends(get_db)):
             detail="Recipe not found"
         )
     
+    if fields:
+        return sparse_response(RecipeResponseSchema, fields, recipe)
     return RecipeResponseSchema.model_validate(recipe)
 
+@router.get("/{recipe_id}/related", response_model=List[RelatedRecipe])
+def get_related_recipes(
+    recipe_id: int,
+    limit: int = Query(5, ge=1, le=settings.RELATED_TOP_K, description="Number of related recipes to return"),
+    db: Session = Depends(get_db)
+):
+    """Recipes most frequently ordered together with this one"""
+    
+    related = related_recipes.related(recipe_id)
+    
+    # One query loads the recipe and its related recipes
+    recipes = {
+        recipe.id: recipe
+        for recipe in db.query(Recipe).options(joinedload(Recipe.category)).filter(
+            Recipe.id.in_([recipe_id] + [other_id for other_id, _ in related]),
+            Recipe.is_available == True
+        )
+    }
+    
+    if recipe_id not in recipes:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recipe not found"
+        )
+    
+    return [
+        RelatedRecipe(**RecipeResponseSchema.model_validate(recipes[other_id]).model_dump(), ordered_together=count)
+        for other_id, count in related
+        if other_id in recipes
+    ][:limit]
+
 @router.get("/{recipe_id}/pricing", response_model=RecipeWithPricing)
 def get_recipe_with_pricing(
     recipe_id: int, 
@@ -1,57 +1,121 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
-from models.user import UserModel
-from serializers.user_serializers import UserSchema, UserToken, UserLogin, UserResponseSchema, UserUpdateSchema
+from typing import List, Optional
+from models.user import UserModel, USER_PUBLIC_COLUMNS
+from serializers.user_serializers import UserSchema, UserToken, UserLogin, UserResponseSchema, UserUpdateSchema, TokenPair, TokenRefresh
 from database import get_db
-from dependencies.auth import get_current_user
+from dependencies.auth import get_current_user, get_current_principal, get_current_admin_user
 from config.enviroment import settings
+from utils.security import password_hasher
+from utils.tokens import TokenPrincipal, issue_tokens, rotate_refresh_token, revoke_session
 
 router = APIRouter()
 
 
-@router.post("/register", response_model=UserResponseSchema)
-def create_user(user: UserSchema, db: Session = Depends(get_db)):
-    # Check if the username or email already exists
-    existing_user = db.query(UserModel).filter(
-        (UserModel.name == user.name) | (UserModel.email == user.email)
-    ).first()
-
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Username or email already exists")
-
-    new_user = UserModel(name=user.name, email=user.email)
-    # Use the set_password method to hash the password
-    new_user.set_password(user.password)
-    print(new_user)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+# register and login are async so bcrypt runs on the dedicated hashing pool
+# without holding a shared threadpool thread; DB work still goes to the threadpool
 
-    return new_user
+@router.post("/register", response_model=UserResponseSchema)
+async def create_user(user: UserSchema, db: Session = Depends(get_db)):
+    # Hash the password on the bounded hashing pool
+    password_hash = await password_hasher.hash(user.password)
+
+    def save():
+        # One INSERT ... RETURNING; the unique name/email constraints reject duplicates
+        try:
+            new_user = db.execute(
+                insert(UserModel)
+                .values(name=user.name, email=user.email, password_hash=password_hash)
+                .returning(*[getattr(UserModel, column) for column in USER_PUBLIC_COLUMNS])
+            ).one()
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Username or email already exists")
+        return UserResponseSchema.model_validate(new_user)
+
+    return await run_in_threadpool(save)
 
 @router.post("/login", response_model=UserToken)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: Session = Depends(get_db)):
 
     # Find the user by email
-    db_user = db.query(UserModel).filter(UserModel.email == user.email).first()
+    db_user = await run_in_threadpool(
+        lambda: db.query(UserModel).filter(UserModel.email == user.email).first()
+    )
 
-    # Check if the user exists and if the password is correct
-    if not db_user or not db_user.verify_password(user.password):
+    if not db_user or not db_user.password_hash:
         raise HTTPException(status_code=400, detail="Invalid username or password")
 
-    # Generate JWT token
-    token = db_user.generate_token()
+    # Check the password on the bounded hashing pool
+    valid, new_hash = await password_hasher.verify_and_update(user.password, db_user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid username or password")
+    if not db_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+
+    # Generate access + refresh tokens for a new session
+    tokens = issue_tokens(db_user)
     user_response = UserResponseSchema.from_orm(db_user)
 
+    # Transparently upgrade hashes made with a different bcrypt cost
+    if new_hash:
+        db_user.password_hash = new_hash
+        await run_in_threadpool(db.commit)
+
+
+    # Return tokens and a success message
+    return {**tokens, "message": "Login successful", "user": user_response}
 
-    # Return token and a success message
-    return {"token": token, "message": "Login successful", "user": user_response}
+@router.post("/refresh", response_model=TokenPair)
+def refresh_tokens(body: TokenRefresh, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access + refresh token pair"""
+    return rotate_refresh_token(
+        db,
+        body.refresh_token,
+        lambda user_id: db.query(UserModel).filter(UserModel.id == user_id).first()
+    )
+
+@router.post("/logout")
+def logout(
+    principal: TokenPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Revoke the current session - its access and refresh tokens stop working"""
+    revoke_session(db, principal.session_id)
+    db.commit()
+    return {"message": "Logged out successfully"}
+
+def _prefix_pattern(value: str) -> str:
+    """LIKE pattern matching values that start with `value` literally (escape character: backslash)"""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
 
 @router.get('/users', response_model=List[UserResponseSchema])
-def get_users(db: Session=Depends(get_db)):
-    users = db.query(UserModel).all()
-    return users
+def get_users(
+    after_id: Optional[int] = Query(None, ge=0, description="Return users with an id greater than this (the last id of the previous page)"),
+    limit: int = Query(50, ge=1, le=500, description="Number of users to return"),
+    email: Optional[str] = Query(None, min_length=1, description="Filter by email prefix (case insensitive)"),
+    name: Optional[str] = Query(None, min_length=1, description="Filter by name prefix (case insensitive)"),
+    is_active: Optional[bool] = Query(None, description="Filter by active flag"),
+    current_user: TokenPrincipal = Depends(get_current_admin_user),
+    db: Session=Depends(get_db)
+):
+    """Page through users by id, loading only the public columns (admins only)"""
+    # Keyset pagination: an indexed range scan on id instead of OFFSET
+    query = db.query(*[getattr(UserModel, column) for column in USER_PUBLIC_COLUMNS])
+    if after_id is not None:
+        query = query.filter(UserModel.id > after_id)
+    if email:
+        query = query.filter(UserModel.email.ilike(_prefix_pattern(email), escape="\\"))
+    if name:
+        query = query.filter(UserModel.name.ilike(_prefix_pattern(name), escape="\\"))
+    if is_active is not None:
+        query = query.filter(UserModel.is_active == is_active)
+    return query.order_by(UserModel.id.asc()).limit(limit).all()
 
 @router.get("/users/{user_id}", response_model=UserResponseSchema)
 def get_single_user(user_id: int, db: Session = Depends(get_db)):
@@ -74,19 +138,30 @@ def get_current_user_profile(current_user: UserModel = Depends(get_current_user)
 @router.put("/profile", response_model=UserResponseSchema)
 def update_user_profile(
     user_update: UserUpdateSchema,
-    current_user: UserModel = Depends(get_current_user),
+    principal: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Update current user's profile"""
-    if user_update.name is not None:
-        current_user.name = user_update.name
-    if user_update.phone is not None:
-        current_user.phone = user_update.phone
-    if user_update.address is not None:
-        current_user.address = user_update.address
-    if user_update.country_code is not None:
-        current_user.country_code = user_update.country_code
+    columns = [getattr(UserModel, column) for column in USER_PUBLIC_COLUMNS]
+    changes = user_update.model_dump(exclude_none=True)
+
+    # One UPDATE ... RETURNING (or a plain read when nothing changes)
+    if changes:
+        stmt = update(UserModel).where(UserModel.id == principal.id).values(**changes).returning(*columns)
+    else:
+        stmt = select(*columns).where(UserModel.id == principal.id)
+    try:
+        user = db.execute(stmt).first()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Username already exists")
+
+    if user is None:
+        db.rollback()
+        raise HTTPException(status_code=401, detail="User not found", headers={"WWW-Authenticate": "Bearer"})
+    if not user.is_active:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Inactive user")
 
     db.commit()
-    db.refresh(current_user)
-    return current_user
+    return UserResponseSchema.model_validate(user)
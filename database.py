@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from config.enviroment import settings  
 from models.base import Base
@@ -31,6 +31,30 @@ def create_tables():
     Base.metadata.create_all(bind=engine)
     print("Database tables created successfully!")
 
+def upgrade_tables():
+    """Create missing tables, then add the columns and indexes create_all skips on existing tables"""
+    print("Upgrading database tables...")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        existing = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            columns = {column["name"] for column in existing.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                # New columns are nullable, so existing rows need no default
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+                for foreign_key in column.foreign_keys:
+                    ddl += f" REFERENCES {foreign_key.column.table.name} ({foreign_key.column.name})"
+                conn.execute(text(ddl))
+                print(f"Added {table.name}.{column.name}")
+            indexes = {index["name"] for index in existing.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+                    print(f"Added index {index.name}")
+    print("Database upgrade complete!")
+
 def drop_tables():
     """Drop all database tables - USE WITH CAUTION"""
     print("Dropping all database tables...")
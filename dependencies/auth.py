@@ -1,20 +1,29 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from database import get_db
 from models.user import UserModel
-from utils.security import verify_token
+from utils.tokens import TokenPrincipal, authenticate_access_token
 
 security = HTTPBearer()
 
+def get_current_principal(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> TokenPrincipal:
+    """Authenticated caller from the access token claims - no database lookup"""
+    # Calls inside /api/batch reuse the principal the batch authenticated once
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    return authenticate_access_token(credentials.credentials)
+
 def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    principal: TokenPrincipal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ) -> UserModel:
-    token = credentials.credentials
-    token_data = verify_token(token)
-    
-    user = db.query(UserModel).filter(UserModel.id == token_data["user_id"]).first()
+    """Full user row, for endpoints that need profile data"""
+    user = db.query(UserModel).filter(UserModel.id == principal.id).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,4 +42,13 @@ def get_current_user(
 def get_current_active_user(current_user: UserModel = Depends(get_current_user)) -> UserModel:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+def get_current_admin_user(principal: TokenPrincipal = Depends(get_current_principal)) -> TokenPrincipal:
+    if not principal.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return principal
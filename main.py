@@ -1,13 +1,50 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
 from controllers.user_controller import router as UserRouter
 from controllers.category_controller import router as CategoryRouter
 from controllers.recipe_controller import router as RecipeRouter
 from controllers.cart_controller import router as CartRouter
 from controllers.order_controller import router as OrderRouter
+from controllers.admin_controller import router as AdminRouter
+from controllers.kitchen_controller import router as KitchenRouter
+from controllers.delivery_controller import router as DeliveryRouter
+from controllers.batch_controller import router as BatchRouter
+from middleware.rate_limit import RateLimitMiddleware
+from middleware.load_shedding import LoadSheddingMiddleware
+from middleware.compression import CompressionMiddleware
+from utils.cart_purge import cart_purger
+from utils.delivery import slot_scheduler
+from utils.related import related_recipes
+from utils.popularity import popularity
+from utils.responses import FastJSONResponse
 import uvicorn
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background maintenance runs in daemon threads for the life of the worker
+    cart_purger.start()
+    slot_scheduler.start()
+    related_recipes.start()
+    popularity.start()
+    yield
+    slot_scheduler.stop()
+    cart_purger.stop()
+
+
+# Default() keeps FastAPI's direct-to-bytes serialization for routes with a response_model
+app = FastAPI(lifespan=lifespan, default_response_class=Default(FastJSONResponse))
+
+# Innermost: only requests that passed rate limiting take a concurrency slot
+app.add_middleware(LoadSheddingMiddleware)
+
+# Added before CORS so CORS stays outermost and 429s still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
+# Wraps rate limiting and load shedding so every response body passes through it
+app.add_middleware(CompressionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +66,10 @@ app.include_router(CategoryRouter, prefix='/api')
 app.include_router(RecipeRouter, prefix='/api')
 app.include_router(CartRouter, prefix='/api')
 app.include_router(OrderRouter, prefix='/api')
+app.include_router(AdminRouter, prefix='/api')
+app.include_router(KitchenRouter, prefix='/api')
+app.include_router(DeliveryRouter, prefix='/api')
+app.include_router(BatchRouter, prefix='/api')
 
 @app.get('/')
 def home():
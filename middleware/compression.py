@@ -0,0 +1,192 @@
+"""Negotiated gzip / brotli response compression.
+
+Responses of a compressible type and at least COMPRESSION_MIN_SIZE bytes are
+compressed with the best encoding the client accepts (brotli when the brotli
+package is installed, else gzip). Streaming responses and bodies that are
+already encoded pass through untouched.
+
+Anonymous catalog GETs return the same bytes to every client, so their
+compressed bodies are kept in an LRU cache keyed by the SHA-256 of the
+uncompressed body and the encoding (COMPRESSION_CACHE_MAX_BYTES in total).
+Hashing is far cheaper than compressing, so a repeated recipe page costs a
+hash and a lookup, and cached bodies can afford a higher compression level.
+Everything else is compressed at the configured (lower) levels.
+
+Bodies of at least COMPRESSION_THREAD_MIN_SIZE bytes are compressed on the
+threadpool so a large page (or a cache miss at the higher level) does not hold
+up the event loop; the cache itself is only touched from the loop.
+"""
+import gzip
+import hashlib
+from collections import OrderedDict
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from config.enviroment import settings
+
+try:
+    import brotli
+except ImportError:  # optional - gzip only without it
+    brotli = None
+
+# Encodings we can produce, most preferred first
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+# Anonymous GETs under these prefixes are identical for every client
+SHARED_PREFIXES = ("/api/recipes", "/api/categories")
+
+# Cached bodies are compressed once, so spend more CPU on them
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 9
+
+
+def _header(scope, name: bytes):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def negotiate(accept_encoding) -> str:
+    """Pick br or gzip from an Accept-Encoding header; None for identity"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        quality = CACHED_BROTLI_QUALITY if cached else settings.COMPRESSION_BROTLI_QUALITY
+        return brotli.compress(body, quality=quality)
+    level = CACHED_GZIP_LEVEL if cached else settings.COMPRESSION_GZIP_LEVEL
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (sha256 of the body, encoding), bounded in bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(body: bytes, encoding: str) -> tuple:
+        return (hashlib.sha256(body).digest(), encoding)
+
+    def get(self, key: tuple) -> bytes:
+        """The compressed body for key, or None (counted as a miss)"""
+        compressed = self._entries.get(key)
+        if compressed is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return compressed
+
+    def put(self, key: tuple, compressed: bytes):
+        if len(compressed) <= self.max_bytes and key not in self._entries:
+            self._entries[key] = compressed
+            self.size += len(compressed)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, cache: CompressedBodyCache = None):
+        self.app = app
+        self.cache = cache or CompressedBodyCache(settings.COMPRESSION_CACHE_MAX_BYTES)
+
+    async def _compress(self, body: bytes, encoding: str, cached: bool) -> bytes:
+        if len(body) >= settings.COMPRESSION_THREAD_MIN_SIZE:
+            return await run_in_threadpool(compress, body, encoding, cached)
+        return compress(body, encoding, cached)
+
+    async def _compress_shared(self, body: bytes, encoding: str) -> bytes:
+        key = self.cache.key(body, encoding)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = await self._compress(body, encoding, cached=True)
+            self.cache.put(key, compressed)
+        return compressed
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(_header(scope, b"accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        shared = (
+            scope["method"] == "GET"
+            and scope["path"].startswith(SHARED_PREFIXES)
+            and _header(scope, b"authorization") is None
+        )
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough or message["type"] not in ("http.response.start", "http.response.body"):
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            if message.get("more_body"):
+                # Streaming (e.g. exports) - leave it alone
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (
+                len(body) < settings.COMPRESSION_MIN_SIZE
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            if shared:
+                compressed = await self._compress_shared(body, encoding)
+            else:
+                compressed = await self._compress(body, encoding, cached=False)
+            headers.add_vary_header("Accept-Encoding")
+            if len(compressed) < len(body):
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                body = compressed
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
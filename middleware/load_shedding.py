@@ -0,0 +1,178 @@
+"""Per-route-group concurrency limits with queue-time based load shedding.
+
+Each route group (catalog reads, cart, checkout, auth) may run a fixed number
+of requests at once; the rest wait in a FIFO queue. Queueing delay is tracked
+CoDel style: once every request in a SHED_INTERVAL_MS window has waited longer
+than SHED_TARGET_MS the group counts as overloaded and new arrivals that would
+have to queue get an immediate 503 instead of piling up behind a slow database.
+Nobody waits longer than SHED_MAX_WAIT_MS.
+
+Checkout is protected: it has its own slots, it is never shed for being
+overloaded (only after the maximum wait), and while checkouts are queueing the
+lower priority groups stop queueing altogether and shed instead, freeing
+database connections for orders.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Optional
+from config.enviroment import settings
+
+# (group, methods or None for any, path prefixes, priority) - first match wins, higher priority is protected
+ROUTE_GROUPS = [
+    ("checkout", ("POST",), ("/api/orders",), 3),
+    ("auth", None, ("/auth/login", "/auth/register", "/auth/refresh"), 2),
+    ("cart", None, ("/api/cart",), 1),
+    ("catalog", ("GET", "HEAD"), ("/api/recipes", "/api/categories", "/api/delivery"), 0),
+]
+
+
+class Shed(Exception):
+    pass
+
+
+class ConcurrencyLimiter:
+    """Async FIFO limiter that measures how long requests queue"""
+
+    def __init__(self, name: str, limit: int, priority: int, target: float, interval: float, max_wait: float,
+                 shed_when_overloaded: bool = True):
+        self.name = name
+        self.limit = limit
+        self.priority = priority
+        self.shed_when_overloaded = shed_when_overloaded
+        self.target = target
+        self.interval = interval
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiters = deque()
+        self.overloaded = False
+        self.shed_count = 0
+        self._above_since = None
+
+    def _record_delay(self, delay: float):
+        now = time.monotonic()
+        if delay < self.target:
+            self._above_since = None
+            self.overloaded = False
+        elif self._above_since is None:
+            self._above_since = now
+        elif now - self._above_since >= self.interval:
+            self.overloaded = True
+
+    def _reject(self):
+        self.shed_count += 1
+        raise Shed(self.name)
+
+    async def acquire(self, must_not_queue: bool = False):
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            self._record_delay(0.0)
+            return
+        if must_not_queue or (self.overloaded and self.shed_when_overloaded):
+            self._reject()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Got the slot just as the wait ran out - give it back
+                self.release()
+            else:
+                waiter.cancel()
+                self._discard(waiter)
+            self._record_delay(time.monotonic() - started)
+            self._reject()
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+                self._discard(waiter)
+            raise
+        self._record_delay(time.monotonic() - started)
+
+    def _discard(self, waiter):
+        try:
+            self.waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self):
+        # Hand the slot straight to the next waiter so it can't be overtaken
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class LoadSheddingMiddleware:
+    def __init__(self, app):
+        self.app = app
+        limits = {
+            "checkout": settings.CONCURRENCY_CHECKOUT,
+            "auth": settings.CONCURRENCY_AUTH,
+            "cart": settings.CONCURRENCY_CART,
+            "catalog": settings.CONCURRENCY_CATALOG,
+        }
+        self.limiters = {
+            group: ConcurrencyLimiter(
+                group,
+                limit=limits[group],
+                priority=priority,
+                target=settings.SHED_TARGET_MS / 1000,
+                interval=settings.SHED_INTERVAL_MS / 1000,
+                max_wait=settings.SHED_MAX_WAIT_MS / 1000,
+                # Checkout only gives up after the maximum wait
+                shed_when_overloaded=group != "checkout",
+            )
+            for group, _, _, priority in ROUTE_GROUPS
+            if limits[group] > 0
+        }
+
+    def _limiter(self, method: str, path: str) -> Optional[ConcurrencyLimiter]:
+        for group, methods, prefixes, _ in ROUTE_GROUPS:
+            if (methods is None or method in methods) and path.startswith(prefixes):
+                return self.limiters.get(group)
+        return None
+
+    def _higher_priority_queueing(self, limiter: ConcurrencyLimiter) -> bool:
+        return any(
+            other.waiters for other in self.limiters.values() if other.priority > limiter.priority
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.LOAD_SHEDDING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self._limiter(scope["method"], scope["path"])
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire(must_not_queue=self._higher_priority_queueing(limiter))
+        except Shed:
+            body = json.dumps({"detail": "Server is busy, please retry shortly"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", b"1"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,251 @@
+"""Token-bucket rate limiting per client IP and per user, for each route group.
+
+Buckets live in process memory by default. Setting RATE_LIMIT_STORE to a file
+path keeps them in a small SQLite database so every worker on the host shares
+the same buckets; its queries run in the threadpool so a locked database never
+stalls the event loop, and if SQLite still fails (locked past the timeout, disk
+errors) the request is let through rather than rejected. Throttled requests get
+a 429 with Retry-After and RateLimit-* headers; allowed requests carry the
+RateLimit-* headers too.
+"""
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from starlette.concurrency import run_in_threadpool
+from config.enviroment import settings
+from utils.tokens import peek_user_id
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+# First matching prefix wins; credential endpoints get their own, stricter group
+ROUTE_GROUPS = [
+    ("auth", ("/auth/login", "/auth/register", "/auth/refresh")),
+    ("api", ("/api", "/auth")),
+]
+
+
+class Limit(NamedTuple):
+    capacity: int
+    rate: float  # tokens per second
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # seconds until the bucket is full again
+    retry_after: int
+
+
+def parse_limit(value: str) -> Optional[Limit]:
+    """'100/minute' -> Limit(100, 100 / 60); empty string -> None"""
+    if not value or not value.strip():
+        return None
+    count, _, period = value.strip().partition("/")
+    return Limit(int(count), int(count) / PERIODS[period.strip().rstrip("s")])
+
+
+def _refill(tokens: float, updated: float, now: float, limit: Limit):
+    tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+    if tokens >= 1:
+        tokens -= 1
+        allowed = True
+        retry_after = 0
+    else:
+        allowed = False
+        retry_after = math.ceil((1 - tokens) / limit.rate)
+    decision = Decision(
+        allowed=allowed,
+        limit=limit.capacity,
+        remaining=int(tokens),
+        reset=math.ceil((limit.capacity - tokens) / limit.rate),
+        retry_after=retry_after,
+    )
+    return tokens, decision
+
+
+class MemoryBucketStore:
+    """Buckets in this process, oldest keys evicted past max_keys"""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def take(self, key: str, limit: Limit) -> Decision:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.capacity, now))
+            tokens, decision = _refill(tokens, updated, now, limit)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return decision
+
+
+class SqliteBucketStore:
+    """Buckets in a local SQLite file, shared by all workers on the host"""
+
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, limit: Limit) -> Optional[Decision]:
+        """None when the database can't be used - the caller lets the request through"""
+        # Wall clock, since the monotonic clock isn't shared between processes
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (limit.capacity, now)
+            tokens, decision = _refill(tokens, updated, now, limit)
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except BaseException as error:
+            if conn.in_transaction:
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+            if isinstance(error, sqlite3.OperationalError):
+                return None
+            raise
+        return decision
+
+
+def create_store():
+    if settings.RATE_LIMIT_STORE == "memory":
+        return MemoryBucketStore()
+    return SqliteBucketStore(settings.RATE_LIMIT_STORE)
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _client_ip(scope) -> str:
+    if settings.TRUST_FORWARDED_FOR:
+        forwarded = _header(scope, b"x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _user_id(scope) -> Optional[int]:
+    authorization = _header(scope, b"authorization")
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    return peek_user_id(authorization[7:].strip())
+
+
+def _rate_limit_headers(decision: Decision):
+    return [
+        (b"ratelimit-limit", str(decision.limit).encode()),
+        (b"ratelimit-remaining", str(decision.remaining).encode()),
+        (b"ratelimit-reset", str(decision.reset).encode()),
+    ]
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, store=None):
+        self.app = app
+        self.store = store or create_store()
+        self.limits = {
+            "auth": {"ip": parse_limit(settings.RATE_LIMIT_AUTH_PER_IP), "user": None},
+            "api": {
+                "ip": parse_limit(settings.RATE_LIMIT_API_PER_IP),
+                "user": parse_limit(settings.RATE_LIMIT_API_PER_USER),
+            },
+        }
+
+    async def _take(self, key: str, limit: Limit) -> Optional[Decision]:
+        if self.store.blocking:
+            return await run_in_threadpool(self.store.take, key, limit)
+        return self.store.take(key, limit)
+
+    def _group(self, path: str) -> Optional[str]:
+        for group, prefixes in ROUTE_GROUPS:
+            if path.startswith(prefixes):
+                return group
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        group = self._group(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        limits = self.limits[group]
+        decisions = []
+        if limits["ip"]:
+            decisions.append(await self._take(f"{group}:ip:{_client_ip(scope)}", limits["ip"]))
+        if limits["user"]:
+            user_id = _user_id(scope)
+            if user_id is not None:
+                decisions.append(await self._take(f"{group}:user:{user_id}", limits["user"]))
+
+        # A store that failed returns None: fail open
+        decisions = [decision for decision in decisions if decision is not None]
+        if not decisions:
+            await self.app(scope, receive, send)
+            return
+
+        denied = [decision for decision in decisions if not decision.allowed]
+        if denied:
+            decision = max(denied, key=lambda d: d.retry_after)
+            body = json.dumps({"detail": "Too many requests, please slow down"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(decision.retry_after).encode()),
+                    *_rate_limit_headers(decision),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        # Report the most constrained bucket on the response
+        decision = min(decisions, key=lambda d: d.remaining)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + _rate_limit_headers(decision)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -3,3 +3,5 @@ from .order import Order, OrderItem
 from .recipe import Recipe
 from .cart import CartItem
 from .category import Category
+from .token import RevokedToken
+from .delivery import DeliverySlot
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -15,4 +15,8 @@ class CartItem(BaseModel):
     recipe = relationship("Recipe", back_populates="cart_items")
     
     # CONSTRAINTS
-    __table_args__ = (UniqueConstraint('user_id', 'recipe_id', name='unique_user_recipe_cart'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'recipe_id', name='unique_user_recipe_cart'),
+        # Lets the abandoned cart purge find stale rows without a full scan
+        Index('ix_cart_items_updated_at', 'updated_at'),
+    )
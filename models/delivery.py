@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, DateTime, CheckConstraint
+from .base import BaseModel
+
+class DeliverySlot(BaseModel):
+    __tablename__ = "delivery_slots"
+    
+    # Slots are created ahead of time by utils/delivery.py, one row per window start
+    starts_at = Column(DateTime(timezone=True), unique=True, nullable=False, index=True)
+    capacity = Column(Integer, nullable=False)
+    booked = Column(Integer, nullable=False, default=0)
+    
+    # CONSTRAINTS
+    __table_args__ = (CheckConstraint('booked >= 0 AND booked <= capacity', name='delivery_slot_capacity'),)
@@ -14,6 +14,12 @@ class Order(BaseModel):
     special_notes = Column(Text)
     order_date = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     estimated_delivery = Column(DateTime(timezone=True))
+    delivery_slot_id = Column(Integer, ForeignKey("delivery_slots.id"), index=True)
+    
+    # Kitchen work queue lease - set while a prep station holds the order
+    claimed_by = Column(String(64))
+    lease_token = Column(String(32), index=True)
+    lease_expires_at = Column(DateTime(timezone=True), index=True)
     
     # Relationships - FIXED class name
     user = relationship("UserModel", back_populates="orders")  # Changed from "User" to "UserModel"
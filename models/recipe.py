@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean, DECIMAL
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean, DECIMAL, DDL, event
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -20,3 +20,35 @@ class Recipe(BaseModel):
     order_items = relationship("OrderItem", back_populates="recipe")
     cart_items = relationship("CartItem", back_populates="recipe")
 
+
+# Full-text search index. The expression must match the one queried by utils/search.py
+# so Postgres can use the GIN index; SQLite gets an FTS5 table kept in sync by triggers.
+def recipe_search_vector(prefix: str = "") -> str:
+    return (
+        f"(setweight(to_tsvector('english', coalesce({prefix}name, '')), 'A') || "
+        f"setweight(to_tsvector('english', coalesce({prefix}description, '')), 'B'))"
+    )
+
+POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_recipes_search ON recipes USING gin ({recipe_search_vector()})",
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5("
+    "name, description, content='recipes', content_rowid='id', "
+    "tokenize='porter unicode61', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_ai AFTER INSERT ON recipes BEGIN "
+    "INSERT INTO recipes_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_ad AFTER DELETE ON recipes BEGIN "
+    "INSERT INTO recipes_fts(recipes_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_au AFTER UPDATE OF name, description ON recipes BEGIN "
+    "INSERT INTO recipes_fts(recipes_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO recipes_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+]
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
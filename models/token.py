@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from .base import BaseModel
+
+class RevokedToken(BaseModel):
+    __tablename__ = "revoked_tokens"
+
+    # token_id is a session id (logout), a refresh token jti (rotation) or user:<id> (deactivation,
+    # created_at is the cutoff: the user's tokens issued before it are rejected)
+    token_id = Column(String(64), unique=True, nullable=False, index=True)
+    kind = Column(String(10), nullable=False)  # options: session-refresh-user
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -2,13 +2,11 @@
 from sqlalchemy import Column, Integer, String, Boolean, Text
 from sqlalchemy.orm import relationship
 from .base import BaseModel
-from passlib.context import CryptContext
-from datetime import datetime, timedelta, timezone
-import jwt 
-from config.enviroment import settings
+# Shared password hashing context (bcrypt cost comes from settings.BCRYPT_ROUNDS)
+from utils.security import pwd_context
 
-# Creating a password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Columns safe to return in listings and exports - never the password hash
+USER_PUBLIC_COLUMNS = ["id", "name", "email", "country_code", "phone", "address", "is_active", "created_at"]
 
 class UserModel(BaseModel):
     __tablename__ = "users"
@@ -35,13 +33,6 @@ class UserModel(BaseModel):
         return pwd_context.verify(password, self.password_hash)
 
     def generate_token(self):
-        # Define the payload 
-        payload = {
-            "exp": datetime.now(timezone.utc) + timedelta(days=1),
-            "iat": datetime.now(timezone.utc), 
-            "sub": str(self.id),
-        }
-
-        # create JWT Token 
-        token = jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-        return token
\ No newline at end of file
+        # Short-lived access token for a new session, see utils/tokens.py
+        from utils.tokens import issue_tokens
+        return issue_tokens(self)["token"]
@@ -1,229 +1,424 @@
-from sqlalchemy.orm import sessionmaker
+"""Bulk, idempotent database seeding.
+
+    python seed.py                      # fixture categories, recipes and the test user
+    python seed.py --scale 100          # plus 200 categories, 100k recipes, 100k users, 1M orders
+    python seed.py --recipes 5000 --orders 0
+
+Fixture rows are written with INSERT ... ON CONFLICT DO NOTHING in one
+transaction, synthetic rows with executemany batches (COPY on Postgres).
+Synthetic counts are totals: a re-run only tops each kind of row up to them.
+"""
+import argparse
+import random
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from sqlalchemy import func, insert, select
 from database import engine
-from models.user import UserModel
-from models.category import Category
-from models.recipe import Recipe
-from utils.security import hash_password
-from database import get_db
 from models.base import Base
+from utils.bulk import insert_ignore, bulk_insert, next_id, sync_sequence
 
 from models import UserModel, Category, Recipe, Order, OrderItem, CartItem
 
-# Create session
-SessionLocal = sessionmaker(bind=engine)
+# Synthetic rows created per unit of --scale
+SCALE_UNIT = {'categories': 2, 'recipes': 1_000, 'users': 1_000, 'orders': 10_000}
 
-def seed_categories():
-    """Seed initial categories"""
-    db = SessionLocal()
+SYNTHETIC_PASSWORD = 'password123'
+SYNTHETIC_EMAIL_DOMAIN = 'synthetic.alosra.com'
+# How synthetic rows are told apart from real ones when topping up
+SYNTHETIC_CATEGORY_PREFIX = 'Synthetic Category '
+SYNTHETIC_RECIPE_IMAGE_PREFIX = 'https://example.com/images/synthetic-recipe-'
+SYNTHETIC_ORDER_NOTE = 'Synthetic seed order'
+
+# Pre-computed bcrypt hash of 'password123' so seeding never runs bcrypt
+PASSWORD123_HASH = '$2b$12$Qn51FKQ1W5Up6It11owse.Xw8yMZhlkcLNiudM.QME5LeSxEuGlc.'
+
+DIFFICULTIES = ['easy', 'medium', 'hard']
+STATUSES = ['pending', 'confirmed', 'preparing', 'out_for_delivery', 'delivered', 'cancelled']
+
+# Words used to build synthetic recipe names and descriptions
+WORDS = [
+    'chicken', 'lamb', 'beef', 'salmon', 'rice', 'saffron', 'curry', 'basil', 'lemon',
+    'garlic', 'tomato', 'spinach', 'chickpea', 'quinoa', 'mushroom', 'coconut', 'ginger',
+    'harissa', 'tahini', 'cardamom', 'sumac', 'pesto', 'mozzarella', 'noodle', 'falafel',
+]
+
+TEST_USER = {
+    'name': 'Ahmed Al-Mansoori',
+    'email': 'test@alosra.com',
+    'password_hash': PASSWORD123_HASH,
+    'phone': '+973-1234-5678',
+    'address': 'Building 123, Road 456, Manama, Bahrain',
+    'country_code': '+973',
+    'is_active': True,
+}
+
+CATEGORIES_DATA = [
+    {
+        'name': 'Arabic Cuisine',
+        'description': 'Traditional Middle Eastern and Bahraini dishes with authentic spices and flavors',
+        'image_url': 'https://example.com/images/arabic-cuisine.jpg',
+        'display_order': 1
+    },
+    {
+        'name': 'Asian Cuisine',
+        'description': 'Delicious flavors from across Asia - Japanese, Chinese, Thai, and Indian dishes',
+        'image_url': 'https://example.com/images/asian-cuisine.jpg',
+        'display_order': 2
+    },
+    {
+        'name': 'Italian Cuisine',
+        'description': 'Classic Italian recipes with fresh ingredients and traditional cooking methods',
+        'image_url': 'https://example.com/images/italian-cuisine.jpg',
+        'display_order': 3
+    },
+    {
+        'name': 'Healthy Options',
+        'description': 'Nutritious and balanced meals for a healthy lifestyle',
+        'image_url': 'https://example.com/images/healthy-cuisine.jpg',
+        'display_order': 4
+    }
+]
+
+RECIPES_DATA = [
+    # Arabic Cuisine
+    {
+        'name': 'Chicken Machboos',
+        'description': 'Traditional Bahraini spiced rice dish with tender chicken, aromatic spices, and basmati rice. A beloved comfort food perfect for family gatherings.',
+        'category': 'Arabic Cuisine',
+        'base_price': Decimal('8.50'),
+        'prep_time_minutes': 45,
+        'difficulty': 'medium',
+        'image_url': 'https://example.com/images/chicken-machboos.jpg'
+    },
+    {
+        'name': 'Lamb Kabsa',
+        'description': 'Aromatic rice dish with tender lamb, mixed vegetables, and traditional Middle Eastern spices. A festive meal that brings families together.',
+        'category': 'Arabic Cuisine',
+        'base_price': Decimal('12.00'),
+        'prep_time_minutes': 60,
+        'difficulty': 'hard',
+        'image_url': 'https://example.com/images/lamb-kabsa.jpg'
+    },
+    {
+        'name': 'Hummus with Falafel',
+        'description': 'Creamy hummus served with crispy homemade falafel, fresh vegetables, and warm pita bread. A healthy and satisfying vegetarian option.',
+        'category': 'Arabic Cuisine',
+        'base_price': Decimal('6.75'),
+        'prep_time_minutes': 30,
+        'difficulty': 'easy',
+        'image_url': 'https://example.com/images/hummus-falafel.jpg'
+    },
     
-    categories_data = [
-        {
-            'name': 'Arabic Cuisine',
-            'description': 'Traditional Middle Eastern and Bahraini dishes with authentic spices and flavors',
-            'image_url': 'https://example.com/images/arabic-cuisine.jpg',
-            'display_order': 1
-        },
-        {
-            'name': 'Asian Cuisine',
-            'description': 'Delicious flavors from across Asia - Japanese, Chinese, Thai, and Indian dishes',
-            'image_url': 'https://example.com/images/asian-cuisine.jpg',
-            'display_order': 2
-        },
-        {
-            'name': 'Italian Cuisine',
-            'description': 'Classic Italian recipes with fresh ingredients and traditional cooking methods',
-            'image_url': 'https://example.com/images/italian-cuisine.jpg',
-            'display_order': 3
-        },
-        {
-            'name': 'Healthy Options',
-            'description': 'Nutritious and balanced meals for a healthy lifestyle',
-            'image_url': 'https://example.com/images/healthy-cuisine.jpg',
-            'display_order': 4
-        }
-    ]
+    # Asian Cuisine
+    {
+        'name': 'Chicken Teriyaki',
+        'description': 'Japanese-style glazed chicken with steamed vegetables and jasmine rice. Sweet and savory flavors that everyone will love.',
+        'category': 'Asian Cuisine',
+        'base_price': Decimal('9.00'),
+        'prep_time_minutes': 30,
+        'difficulty': 'easy',
+        'image_url': 'https://example.com/images/chicken-teriyaki.jpg'
+    },
+    {
+        'name': 'Thai Green Curry',
+        'description': 'Spicy and creamy green curry with chicken, Thai basil, and coconut milk. Served with fragrant jasmine rice.',
+        'category': 'Asian Cuisine',
+        'base_price': Decimal('10.25'),
+        'prep_time_minutes': 35,
+        'difficulty': 'medium',
+        'image_url': 'https://example.com/images/thai-green-curry.jpg'
+    },
+    {
+        'name': 'Beef Stir Fry',
+        'description': 'Quick and healthy stir-fried beef with mixed vegetables in a savory sauce. Perfect for busy weeknight dinners.',
+        'category': 'Asian Cuisine',
+        'base_price': Decimal('11.50'),
+        'prep_time_minutes': 20,
+        'difficulty': 'easy',
+        'image_url': 'https://example.com/images/beef-stir-fry.jpg'
+    },
     
-    for category_data in categories_data:
-        # Check if category already exists
-        existing_category = db.query(Category).filter(Category.name == category_data['name']).first()
-        if not existing_category:
-            category = Category(**category_data)
-            db.add(category)
+    # Italian Cuisine
+    {
+        'name': 'Spaghetti Carbonara',
+        'description': 'Classic Roman pasta dish with eggs, pancetta, parmesan cheese, and black pepper. Simple ingredients, extraordinary taste.',
+        'category': 'Italian Cuisine',
+        'base_price': Decimal('7.50'),
+        'prep_time_minutes': 25,
+        'difficulty': 'medium',
+        'image_url': 'https://example.com/images/spaghetti-carbonara.jpg'
+    },
+    {
+        'name': 'Margherita Pizza',
+        'description': 'Classic Italian pizza with fresh mozzarella, tomatoes, and basil. Made with authentic Italian ingredients and traditional methods.',
+        'category': 'Italian Cuisine',
+        'base_price': Decimal('9.75'),
+        'prep_time_minutes': 40,
+        'difficulty': 'medium',
+        'image_url': 'https://example.com/images/margherita-pizza.jpg'
+    },
+    {
+        'name': 'Chicken Parmigiana',
+        'description': 'Breaded chicken breast topped with marinara sauce and melted mozzarella cheese. Served with spaghetti pasta.',
+        'category': 'Italian Cuisine',
+        'base_price': Decimal('11.25'),
+        'prep_time_minutes': 35,
+        'difficulty': 'medium',
+        'image_url': 'https://example.com/images/chicken-parmigiana.jpg'
+    },
     
-    db.commit()
-    db.close()
+    # Healthy Options
+    {
+        'name': 'Grilled Salmon Bowl',
+        'description': 'Fresh grilled salmon with quinoa, avocado, mixed greens, and lemon vinaigrette. Packed with omega-3s and nutrients.',
+        'category': 'Healthy Options',
+        'base_price': Decimal('13.50'),
+        'prep_time_minutes': 25,
+        'difficulty': 'easy',
+        'image_url': 'https://example.com/images/grilled-salmon-bowl.jpg'
+    },
+    {
+        'name': 'Mediterranean Chickpea Salad',
+        'description': 'Protein-rich chickpea salad with cucumbers, tomatoes, olives, and feta cheese. Light yet satisfying.',
+        'category': 'Healthy Options',
+        'base_price': Decimal('8.25'),
+        'prep_time_minutes': 15,
+        'difficulty': 'easy',
+        'image_url': 'https://example.com/images/mediterranean-chickpea-salad.jpg'
+    },
+    {
+        'name': 'Quinoa Stuffed Bell Peppers',
+        'description': 'Colorful bell peppers stuffed with quinoa, vegetables, and herbs. A complete vegetarian meal full of nutrients.',
+        'category': 'Healthy Options',
+        'base_price': Decimal('9.50'),
+        'prep_time_minutes': 45,
+        'difficulty': 'medium',
+        'image_url': 'https://example.com/images/quinoa-stuffed-peppers.jpg'
+    }
+]
+
+
+def synthetic_email(user_id: int) -> str:
+    return f"synthetic{user_id}@{SYNTHETIC_EMAIL_DOMAIN}"
+
+
+def seed_categories(conn):
+    """Seed initial categories"""
+    insert_ignore(conn, Category, [
+        {'is_active': True, **category_data} for category_data in CATEGORIES_DATA
+    ], 'name')
     print("Categories seeded successfully!")
 
-def seed_recipes():
+
+def seed_recipes(conn):
     """Seed initial recipes"""
-    db = SessionLocal()
-    
-    # Get category IDs
-    arabic_category = db.query(Category).filter(Category.name == 'Arabic Cuisine').first()
-    asian_category = db.query(Category).filter(Category.name == 'Asian Cuisine').first()
-    italian_category = db.query(Category).filter(Category.name == 'Italian Cuisine').first()
-    healthy_category = db.query(Category).filter(Category.name == 'Healthy Options').first()
-    
-    recipes_data = [
-        # Arabic Cuisine
-        {
-            'name': 'Chicken Machboos',
-            'description': 'Traditional Bahraini spiced rice dish with tender chicken, aromatic spices, and basmati rice. A beloved comfort food perfect for family gatherings.',
-            'category_id': arabic_category.id,
-            'base_price': Decimal('8.50'),
-            'prep_time_minutes': 45,
-            'difficulty': 'medium',
-            'image_url': 'https://example.com/images/chicken-machboos.jpg'
-        },
-        {
-            'name': 'Lamb Kabsa',
-            'description': 'Aromatic rice dish with tender lamb, mixed vegetables, and traditional Middle Eastern spices. A festive meal that brings families together.',
-            'category_id': arabic_category.id,
-            'base_price': Decimal('12.00'),
-            'prep_time_minutes': 60,
-            'difficulty': 'hard',
-            'image_url': 'https://example.com/images/lamb-kabsa.jpg'
-        },
-        {
-            'name': 'Hummus with Falafel',
-            'description': 'Creamy hummus served with crispy homemade falafel, fresh vegetables, and warm pita bread. A healthy and satisfying vegetarian option.',
-            'category_id': arabic_category.id,
-            'base_price': Decimal('6.75'),
-            'prep_time_minutes': 30,
-            'difficulty': 'easy',
-            'image_url': 'https://example.com/images/hummus-falafel.jpg'
-        },
-        
-        # Asian Cuisine
-        {
-            'name': 'Chicken Teriyaki',
-            'description': 'Japanese-style glazed chicken with steamed vegetables and jasmine rice. Sweet and savory flavors that everyone will love.',
-            'category_id': asian_category.id,
-            'base_price': Decimal('9.00'),
-            'prep_time_minutes': 30,
-            'difficulty': 'easy',
-            'image_url': 'https://example.com/images/chicken-teriyaki.jpg'
-        },
-        {
-            'name': 'Thai Green Curry',
-            'description': 'Spicy and creamy green curry with chicken, Thai basil, and coconut milk. Served with fragrant jasmine rice.',
-            'category_id': asian_category.id,
-            'base_price': Decimal('10.25'),
-            'prep_time_minutes': 35,
-            'difficulty': 'medium',
-            'image_url': 'https://example.com/images/thai-green-curry.jpg'
-        },
-        {
-            'name': 'Beef Stir Fry',
-            'description': 'Quick and healthy stir-fried beef with mixed vegetables in a savory sauce. Perfect for busy weeknight dinners.',
-            'category_id': asian_category.id,
-            'base_price': Decimal('11.50'),
-            'prep_time_minutes': 20,
-            'difficulty': 'easy',
-            'image_url': 'https://example.com/images/beef-stir-fry.jpg'
-        },
-        
-        # Italian Cuisine
-        {
-            'name': 'Spaghetti Carbonara',
-            'description': 'Classic Roman pasta dish with eggs, pancetta, parmesan cheese, and black pepper. Simple ingredients, extraordinary taste.',
-            'category_id': italian_category.id,
-            'base_price': Decimal('7.50'),
-            'prep_time_minutes': 25,
-            'difficulty': 'medium',
-            'image_url': 'https://example.com/images/spaghetti-carbonara.jpg'
-        },
-        {
-            'name': 'Margherita Pizza',
-            'description': 'Classic Italian pizza with fresh mozzarella, tomatoes, and basil. Made with authentic Italian ingredients and traditional methods.',
-            'category_id': italian_category.id,
-            'base_price': Decimal('9.75'),
-            'prep_time_minutes': 40,
-            'difficulty': 'medium',
-            'image_url': 'https://example.com/images/margherita-pizza.jpg'
-        },
-        {
-            'name': 'Chicken Parmigiana',
-            'description': 'Breaded chicken breast topped with marinara sauce and melted mozzarella cheese. Served with spaghetti pasta.',
-            'category_id': italian_category.id,
-            'base_price': Decimal('11.25'),
-            'prep_time_minutes': 35,
-            'difficulty': 'medium',
-            'image_url': 'https://example.com/images/chicken-parmigiana.jpg'
-        },
-        
-        # Healthy Options
-        {
-            'name': 'Grilled Salmon Bowl',
-            'description': 'Fresh grilled salmon with quinoa, avocado, mixed greens, and lemon vinaigrette. Packed with omega-3s and nutrients.',
-            'category_id': healthy_category.id,
-            'base_price': Decimal('13.50'),
-            'prep_time_minutes': 25,
-            'difficulty': 'easy',
-            'image_url': 'https://example.com/images/grilled-salmon-bowl.jpg'
-        },
-        {
-            'name': 'Mediterranean Chickpea Salad',
-            'description': 'Protein-rich chickpea salad with cucumbers, tomatoes, olives, and feta cheese. Light yet satisfying.',
-            'category_id': healthy_category.id,
-            'base_price': Decimal('8.25'),
-            'prep_time_minutes': 15,
-            'difficulty': 'easy',
-            'image_url': 'https://example.com/images/mediterranean-chickpea-salad.jpg'
-        },
-        {
-            'name': 'Quinoa Stuffed Bell Peppers',
-            'description': 'Colorful bell peppers stuffed with quinoa, vegetables, and herbs. A complete vegetarian meal full of nutrients.',
-            'category_id': healthy_category.id,
-            'base_price': Decimal('9.50'),
-            'prep_time_minutes': 45,
-            'difficulty': 'medium',
-            'image_url': 'https://example.com/images/quinoa-stuffed-peppers.jpg'
-        }
-    ]
-    
-    for recipe_data in recipes_data:
-        # Check if recipe already exists
-        existing_recipe = db.query(Recipe).filter(Recipe.name == recipe_data['name']).first()
-        if not existing_recipe:
-            recipe = Recipe(**recipe_data)
-            db.add(recipe)
-    
-    db.commit()
-    db.close()
+    category_ids = dict(conn.execute(
+        select(Category.name, Category.id).where(
+            Category.name.in_({recipe['category'] for recipe in RECIPES_DATA})
+        )
+    ).all())
+
+    # Recipe names have no unique constraint, so look the existing ones up in one query
+    existing = set(conn.execute(
+        select(Recipe.name).where(Recipe.name.in_([recipe['name'] for recipe in RECIPES_DATA]))
+    ).scalars())
+
+    rows = []
+    for recipe_data in RECIPES_DATA:
+        if recipe_data['name'] in existing:
+            continue
+        row = {key: value for key, value in recipe_data.items() if key != 'category'}
+        row['category_id'] = category_ids[recipe_data['category']]
+        row['is_available'] = True
+        rows.append(row)
+
+    if rows:
+        conn.execute(insert(Recipe), rows)
     print("Recipes seeded successfully!")
 
-def seed_test_user():
+
+def seed_test_user(conn):
     """Create a test user for development"""
-    db = SessionLocal()
-    
-    # Check if test user already exists
-    existing_user = db.query(UserModel).filter(UserModel.email == 'test@alosra.com').first()
-    if not existing_user:
-        test_user = UserModel(
-            name='Ahmed Al-Mansoori',
-            email='test@alosra.com',
-            password_hash=hash_password('password123'),
-            phone='+973-1234-5678',
-            address='Building 123, Road 456, Manama, Bahrain'
-        )
-        db.add(test_user)
-        db.commit()
-        print("Test user created: test@alosra.com / password123")
-    else:
-        print("Test user already exists")
-    
-    db.close()
+    insert_ignore(conn, UserModel, [TEST_USER], 'email')
+    print("Test user ready: test@alosra.com / password123")
+
+
+def seed_synthetic(
+    conn,
+    categories: int = 0,
+    recipes: int = 0,
+    users: int = 0,
+    orders: int = 0,
+    batch_size: int = 5_000,
+    rng_seed: int = 42,
+) -> dict:
+    """Top the synthetic catalog, user base and order history up to the given totals"""
+    rng = random.Random(rng_seed)
+    now = datetime.now(timezone.utc)
+
+    def existing(model, condition) -> int:
+        return conn.execute(select(func.count()).select_from(model).where(condition)).scalar()
 
-def seed_all():
-    """Seed all initial data"""
+    first_category = next_id(conn, Category)
+    missing = max(0, categories - existing(Category, Category.name.like(f"{SYNTHETIC_CATEGORY_PREFIX}%")))
+    new_category_ids = list(range(first_category, first_category + missing))
+    bulk_insert(conn, Category, [
+        {
+            'id': category_id,
+            'name': f"{SYNTHETIC_CATEGORY_PREFIX}{category_id}",
+            'description': f"Synthetic category {category_id}",
+            'image_url': f"https://example.com/images/synthetic-category-{category_id}.jpg",
+            'is_active': True,
+            'display_order': 100 + index,
+        }
+        for index, category_id in enumerate(new_category_ids)
+    ])
+    sync_sequence(conn, Category)
+
+    # Synthetic recipes may land in any category, fixture ones included
+    category_ids = list(conn.execute(select(Category.id)).scalars())
+    synthetic_recipe = Recipe.image_url.like(f"{SYNTHETIC_RECIPE_IMAGE_PREFIX}%")
+    prices = dict(conn.execute(select(Recipe.id, Recipe.base_price).where(synthetic_recipe)).all())
+    first_recipe = next_id(conn, Recipe)
+    recipe_ids = list(range(first_recipe, first_recipe + max(0, recipes - len(prices))))
+    for start in range(0, len(recipe_ids), batch_size):
+        rows = []
+        for recipe_id in recipe_ids[start:start + batch_size]:
+            words = rng.sample(WORDS, 3)
+            price = Decimal(rng.randint(300, 2500)) / 100
+            prices[recipe_id] = price
+            rows.append({
+                'id': recipe_id,
+                'name': f"{' '.join(words).title()} #{recipe_id}",
+                'description': f"A synthetic dish of {words[0]} with {words[1]} and {words[2]}. " * 3,
+                'category_id': rng.choice(category_ids),
+                'base_price': price,
+                'prep_time_minutes': rng.randint(10, 90),
+                'difficulty': rng.choice(DIFFICULTIES),
+                'image_url': f"{SYNTHETIC_RECIPE_IMAGE_PREFIX}{recipe_id}.jpg",
+                'is_available': rng.random() > 0.02,
+            })
+        bulk_insert(conn, Recipe, rows)
+    sync_sequence(conn, Recipe)
+
+    synthetic_user = UserModel.email.like(f"%@{SYNTHETIC_EMAIL_DOMAIN}")
+    existing_user_ids = list(conn.execute(select(UserModel.id).where(synthetic_user)).scalars())
+    first_user = next_id(conn, UserModel)
+    user_ids = list(range(first_user, first_user + max(0, users - len(existing_user_ids))))
+    for start in range(0, len(user_ids), batch_size):
+        bulk_insert(conn, UserModel, [
+            {
+                'id': user_id,
+                'name': f"Synthetic User {user_id}",
+                'email': synthetic_email(user_id),
+                'password_hash': PASSWORD123_HASH,
+                'country_code': '+973',
+                'phone': f"+973-{rng.randint(30000000, 39999999)}",
+                'address': f"Building {rng.randint(1, 999)}, Road {rng.randint(1, 9999)}, Manama",
+                'is_active': True,
+            }
+            for user_id in user_ids[start:start + batch_size]
+        ])
+    sync_sequence(conn, UserModel)
+
+    # New orders go to any synthetic user and recipe, earlier runs' included
+    order_user_ids = existing_user_ids + user_ids
+    order_recipe_ids = list(prices)
+    orders = max(0, orders - existing(Order, Order.special_notes == SYNTHETIC_ORDER_NOTE))
+
+    order_count = 0
+    item_count = 0
+    if orders and order_user_ids and order_recipe_ids:
+        next_order = next_id(conn, Order)
+        next_item = next_id(conn, OrderItem)
+        remaining = orders
+        while remaining > 0:
+            chunk = min(batch_size, remaining)
+            order_rows = []
+            item_rows = []
+            for order_id in range(next_order, next_order + chunk):
+                total = Decimal('0.00')
+                for _ in range(rng.randint(1, 4)):
+                    recipe_id = rng.choice(order_recipe_ids)
+                    people = rng.randint(1, 8)
+                    unit_price = prices[recipe_id]
+                    calculated_price = unit_price * people
+                    total += calculated_price
+                    item_rows.append({
+                        'id': next_item,
+                        'order_id': order_id,
+                        'recipe_id': recipe_id,
+                        'number_of_people': people,
+                        'unit_price': unit_price,
+                        'calculated_price': calculated_price,
+                    })
+                    next_item += 1
+                order_date = now - timedelta(minutes=rng.randint(0, 60 * 24 * 180))
+                order_rows.append({
+                    'id': order_id,
+                    'user_id': rng.choice(order_user_ids),
+                    'total_amount': total,
+                    'status': rng.choice(STATUSES),
+                    'delivery_address': 'Building 1, Road 1, Manama',
+                    'delivery_phone': '+973-1234-5678',
+                    'special_notes': SYNTHETIC_ORDER_NOTE,
+                    'order_date': order_date,
+                    'estimated_delivery': order_date + timedelta(hours=2),
+                })
+            bulk_insert(conn, Order, order_rows)
+            bulk_insert(conn, OrderItem, item_rows)
+            order_count += len(order_rows)
+            item_count += len(item_rows)
+            next_order += chunk
+            remaining -= chunk
+        sync_sequence(conn, Order)
+        sync_sequence(conn, OrderItem)
+
+    counts = {
+        'categories': len(new_category_ids),
+        'recipes': len(recipe_ids),
+        'users': len(user_ids),
+        'orders': order_count,
+        'order_items': item_count,
+    }
+    print(f"Synthetic data seeded: {counts}")
+    return counts
+
+
+def seed_all(scale: int = 0, batch_size: int = 5_000, **counts):
+    """Seed all initial data (plus synthetic data when scale or counts are given)"""
     print("Starting database seeding...")
-    seed_categories()
-    seed_recipes()
-    seed_test_user()
+    Base.metadata.create_all(bind=engine)
+
+    # One connection and transaction for the whole run
+    with engine.begin() as conn:
+        seed_categories(conn)
+        seed_recipes(conn)
+        seed_test_user(conn)
+
+        synthetic = {key: value * scale for key, value in SCALE_UNIT.items()}
+        synthetic.update({key: value for key, value in counts.items() if value is not None})
+        if any(synthetic.values()):
+            seed_synthetic(conn, batch_size=batch_size, **synthetic)
+
     print("Database seeding completed successfully!")
 
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the Alosra Recipez database")
+    parser.add_argument('--scale', type=int, default=0,
+                        help="Synthetic scale factor, one unit = %s" % SCALE_UNIT)
+    for key in SCALE_UNIT:
+        parser.add_argument(f"--{key}", type=int, help=f"Exact number of synthetic {key} (overrides --scale)")
+    parser.add_argument('--batch-size', type=int, default=5_000)
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    # This allows you to run: python seed.py
-    seed_all()
\ No newline at end of file
+    # This allows you to run: python seed.py [--scale N]
+    args = parse_args()
+    seed_all(
+        scale=args.scale,
+        batch_size=args.batch_size,
+        **{key: getattr(args, key) for key in SCALE_UNIT}
+    )
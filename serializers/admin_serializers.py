@@ -0,0 +1,60 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+from enum import Enum
+
+
+# Datasets available for streaming export
+class ExportDataset(str, Enum):
+    RECIPES = "recipes"
+    CATEGORIES = "categories"
+    ORDERS = "orders"
+    USERS = "users"
+
+
+# Validation or write error for a single import row
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+# Result of a bulk catalog import
+class ImportReport(BaseModel):
+    processed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
+    catalog_version: int
+
+
+# Outcome of one abandoned cart purge run
+class CartPurgeRun(BaseModel):
+    finished_at: datetime
+    duration_ms: float
+    removed: Dict[str, int]
+
+
+# Cart purge counters since this worker started
+class CartPurgeMetrics(BaseModel):
+    retention_days: Optional[int]
+    interval_seconds: int
+    runs: int
+    batches: int
+    errors: int
+    removed: Dict[str, int]
+    last_run: Optional[CartPurgeRun] = None
+
+
+# Route cache counters for this worker
+class RouteCacheMetrics(BaseModel):
+    enabled: bool
+    ttl_seconds: int
+    max_entries: int
+    entries: int
+    in_flight: int
+    hits: int
+    misses: int
+    coalesced: int
+    evictions: int
@@ -0,0 +1,46 @@
+from pydantic import BaseModel, field_validator
+from typing import Any, Dict, List, Literal, Optional
+from config.enviroment import settings
+
+
+# One call inside a batch, e.g. {"id": "cart", "path": "/api/cart/"}
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = None
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str
+    body: Optional[Any] = None
+
+    @field_validator("path")
+    @classmethod
+    def validate_path(cls, v):
+        if not v.startswith(("/api/", "/auth/")):
+            raise ValueError("Path must start with /api/ or /auth/")
+        if v.split("?")[0].rstrip("/") == "/api/batch":
+            raise ValueError("Batches cannot be nested")
+        return v
+
+
+# Schema for a batch of calls run concurrently
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest]
+
+    @field_validator("requests")
+    @classmethod
+    def validate_requests(cls, v):
+        if not v:
+            raise ValueError("At least one request is required")
+        if len(v) > settings.BATCH_MAX_REQUESTS:
+            raise ValueError(f"At most {settings.BATCH_MAX_REQUESTS} requests per batch")
+        return v
+
+
+# Result of one call, in the same position as its request
+class BatchSubResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
@@ -1,6 +1,6 @@
 # cart_serializers.py - FINAL FIXED VERSION
-from pydantic import BaseModel, field_validator, computed_field
-from typing import List, Optional
+from pydantic import BaseModel, field_validator, model_validator, computed_field
+from typing import List, Literal, Optional
 from decimal import Decimal
 from datetime import datetime
 
@@ -24,6 +24,34 @@ class CartItemCreate(CartItemBase):
 class CartItemUpdate(BaseModel):
     number_of_people: int
 
+# One operation of a bulk cart update
+class CartOperation(BaseModel):
+    op: Literal["set", "remove", "clear"]
+    recipe_id: Optional[int] = None
+    number_of_people: Optional[int] = None
+
+    @model_validator(mode="after")
+    def validate_operation(self):
+        if self.op in ("set", "remove") and self.recipe_id is None:
+            raise ValueError(f"'{self.op}' requires recipe_id")
+        if self.op == "set":
+            if self.number_of_people is None or self.number_of_people < 1 or self.number_of_people > 20:
+                raise ValueError("Number of people must be between 1 and 20")
+        return self
+
+# Schema for bulk cart updates, operations are applied in order
+class CartBulkUpdate(BaseModel):
+    operations: List[CartOperation]
+
+    @field_validator("operations")
+    @classmethod
+    def validate_operations(cls, v):
+        if not v:
+            raise ValueError("At least one operation is required")
+        if len(v) > 100:
+            raise ValueError("At most 100 operations per request")
+        return v
+
 # Response Schema for cart items
 class CartItemResponseSchema(CartItemBase):
     id: int
@@ -43,6 +71,12 @@ class CartResponseSchema(BaseModel):
     total_amount: Decimal
     total_items: int
 
+# Response Schema for the cart badge, computed in SQL
+class CartSummarySchema(BaseModel):
+    total_items: int
+    total_people: int
+    total_amount: Decimal
+
 # Forward reference - keep at bottom
 from .recipe_serializers import RecipeResponseSchema
 CartItemResponseSchema.model_rebuild()
\ No newline at end of file
@@ -23,6 +23,12 @@ class CategoryResponseSchema(BaseModel):
         from_attributes = True
 
 
+# Schema for one row of a catalog import (upserted by name)
+class CategoryImportRow(CategoryBase):
+    is_active: bool = True
+    display_order: int = 0
+
+
 class CategoryWithRecipes(CategoryResponseSchema):
     recipes: List["RecipeResponseSchema"] = []
 
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, computed_field
+from datetime import datetime, timedelta
+from config.enviroment import settings
+
+
+# Response Schema for a delivery window and its remaining capacity
+class DeliverySlotSchema(BaseModel):
+    id: int
+    starts_at: datetime
+    capacity: int
+    booked: int
+
+    @computed_field
+    @property
+    def ends_at(self) -> datetime:
+        return self.starts_at + timedelta(minutes=settings.DELIVERY_SLOT_MINUTES)
+
+    @computed_field
+    @property
+    def available(self) -> int:
+        return max(0, self.capacity - self.booked)
+
+    class Config:
+        from_attributes = True
@@ -88,8 +88,35 @@ class OrderSummarySchema(BaseModel):
         from_attributes = True
 
 
+# Schema for a prep station claiming work from the kitchen queue
+class KitchenClaimRequest(BaseModel):
+    station: str
+    limit: int = 1
+
+    @field_validator("station")
+    @classmethod
+    def validate_station(cls, v):
+        v = v.strip()
+        if not v or len(v) > 64:
+            raise ValueError("Station must be between 1 and 64 characters")
+        return v
+
+
+# Schema for acting on a claimed order
+class KitchenLease(BaseModel):
+    lease_token: str
+
+
+# Response Schema for an order claimed by the kitchen
+class KitchenOrderSchema(OrderResponseSchema):
+    claimed_by: Optional[str] = None
+    lease_token: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+
+
 from .recipe_serializers import RecipeResponseSchema
-OrderItemResponseSchema.model_rebuild()               
+OrderItemResponseSchema.model_rebuild()
+KitchenOrderSchema.model_rebuild()               
 
 
 
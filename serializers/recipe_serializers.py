@@ -1,7 +1,21 @@
 from pydantic import BaseModel, field_validator
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 from datetime import datetime
+from enum import Enum
+
+
+# Recipe list ordering
+class RecipeSort(str, Enum):
+    NAME = "name"
+    POPULAR = "popular"
+
+
+# Time window for popularity ordering
+class PopularityWindow(str, Enum):
+    DAY = "24h"
+    WEEK = "7d"
+    ALL_TIME = "all"
 
 
 # Schema for Recipes 
@@ -44,6 +58,27 @@ class RecipeResponseSchema(RecipeBase):
 class RecipeWithPricing(RecipeResponseSchema):
     calculated_price: Optional[Decimal] = None
 
+# Prices for many recipes at a range of party sizes: prices[i][j] is recipe_ids[i] for people[j]
+class RecipePricingMatrix(BaseModel):
+    people: List[int]
+    recipe_ids: List[int]
+    prices: List[List[Decimal]]
+    missing: List[int] = []
+
+# Search result with relevance rank (higher is more relevant)
+class RecipeSearchResult(RecipeResponseSchema):
+    rank: float = 0.0
+
+# Related recipe with how many orders contained both recipes
+class RelatedRecipe(RecipeResponseSchema):
+    ordered_together: int = 0
+
+# Schema for one row of a catalog import (id present = update, missing = insert)
+class RecipeImportRow(RecipeBase):
+    id: Optional[int] = None
+    category_id: int
+    is_available: bool = True
+
 # Forward reference
 from .category_serializers import CategoryResponseSchema
 RecipeResponseSchema.model_rebuild()
@@ -32,6 +32,18 @@ class UserResponseSchema(BaseModel):
 
 
 
+# Schema for one row of a bulk user import
+class UserImportRow(BaseModel):
+    name: str
+    email: str
+    password: str
+    country_code: Optional[str] = "+973"
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    is_active: bool = True
+
+
+
 # User Update 
          
 class UserUpdateSchema(BaseModel):
@@ -43,15 +55,31 @@ class UserUpdateSchema(BaseModel):
     class Config:
         from_attributes = True 
 
+# Admin: activate / deactivate a user
+class UserActiveUpdate(BaseModel):
+    is_active: bool
+
 # User Login
 class UserLogin(BaseModel):
     email: str
     password: str
 
 
+# Access + refresh token pair
+class TokenPair(BaseModel):
+    token: str  # short-lived access token
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int  # access token lifetime in seconds
+
+
+# Refresh token exchange
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
+
 # Rspone to user containing JWT
-class UserToken(BaseModel):
-    token: str
+class UserToken(TokenPair):
     message: str
     user: UserResponseSchema
 
@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+# Settings are read at import time: point the app at a throwaway SQLite database first
+_db_dir = tempfile.mkdtemp(prefix="alosra-tests-")
+os.environ["DB_URI"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret-key-for-the-round-trip-suite")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["ADMIN_EMAILS"] = "admin@example.com"
+
+import pytest
+from fastapi.testclient import TestClient
+from database import create_tables
+import seed
+
+
+@pytest.fixture(scope="session")
+def app():
+    create_tables()
+    seed.seed_all()
+    from main import app
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    # No lifespan: background jobs would run queries of their own
+    return TestClient(app)
+
+
+def login(client, name: str, email: str, password: str = "password123") -> dict:
+    """Register (if needed) and log in; returns the login response body"""
+    client.post("/auth/register", json={"name": name, "email": email, "password": password})
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    return bearer(login(client, "Round Trip", "round-trip@example.com")["token"])
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    return bearer(login(client, "Admin", "admin@example.com")["token"])
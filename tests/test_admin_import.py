@@ -0,0 +1,60 @@
+"""Catalog imports only overwrite the columns an upload provides."""
+from database import SessionLocal
+from models.category import Category
+from models.recipe import Recipe
+
+
+def _import(client, admin_headers, path: str, csv_text: str) -> dict:
+    response = client.post(
+        f"/api/admin/catalog/{path}/import",
+        files={"file": ("import.csv", csv_text, "text/csv")},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["failed"] == 0, report["errors"]
+    return report
+
+
+def _category(name: str) -> Category:
+    with SessionLocal() as db:
+        return db.query(Category).filter(Category.name == name).one()
+
+
+def test_partial_category_import_keeps_other_columns(client, admin_headers):
+    _import(client, admin_headers, "categories",
+            "name,image_url,is_active,display_order\n"
+            "Asian Cuisine,https://example.com/images/asian-cuisine.jpg,false,7\n")
+    before = _category("Asian Cuisine")
+    assert (before.is_active, before.display_order) == (False, 7)
+
+    report = _import(client, admin_headers, "categories",
+                     "name,image_url,description\n"
+                     "Asian Cuisine,https://example.com/images/asian-v2.jpg,Updated description\n"
+                     "Brand New Cuisine,https://example.com/images/new.jpg,\n")
+    assert (report["inserted"], report["updated"]) == (1, 1)
+
+    after = _category("Asian Cuisine")
+    assert after.image_url == "https://example.com/images/asian-v2.jpg"
+    assert after.description == "Updated description"
+    assert (after.is_active, after.display_order) == (False, 7)
+
+    # New rows still get the schema defaults
+    created = _category("Brand New Cuisine")
+    assert (created.is_active, created.display_order) == (True, 0)
+
+
+def test_partial_recipe_import_keeps_other_columns(client, admin_headers):
+    with SessionLocal() as db:
+        recipe = db.query(Recipe).filter(Recipe.id == 1).one()
+        before = (recipe.prep_time_minutes, recipe.image_url, recipe.is_available)
+        category_id = recipe.category_id
+
+    _import(client, admin_headers, "recipes",
+            "id,name,description,base_price,category_id\n"
+            f"1,Chicken Machboos,Imported description,9.75,{category_id}\n")
+
+    with SessionLocal() as db:
+        recipe = db.query(Recipe).filter(Recipe.id == 1).one()
+        assert recipe.description == "Imported description"
+        assert (recipe.prep_time_minutes, recipe.image_url, recipe.is_available) == before
@@ -0,0 +1,69 @@
+"""Token lifecycle: logout, refresh rotation and user deactivation."""
+from conftest import bearer, login
+
+
+def test_logout_revokes_the_session(client):
+    tokens = login(client, "Logout User", "logout@example.com")
+    headers = bearer(tokens["token"])
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+
+def test_refresh_token_reuse_revokes_the_session(client):
+    tokens = login(client, "Rotate User", "rotate@example.com")
+    rotated = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert rotated.status_code == 200, rotated.text
+
+    replayed = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert replayed.status_code == 401
+    assert client.get("/auth/me", headers=bearer(rotated.json()["token"])).status_code == 401
+
+
+def test_deactivation_commits_with_the_revocation(client, admin_headers):
+    tokens = login(client, "Deactivated User", "deactivated@example.com")
+    user_id = tokens["user"]["id"]
+
+    response = client.put(f"/api/admin/users/{user_id}/active", json={"is_active": False}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["is_active"] is False
+    # Deactivating twice is a no-op, not a rolled back request
+    response = client.put(f"/api/admin/users/{user_id}/active", json={"is_active": False}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    assert client.get("/auth/me", headers=bearer(tokens["token"])).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert client.post("/auth/login", json={"email": "deactivated@example.com", "password": "password123"}).status_code == 400
+
+
+def test_reactivation_does_not_restore_old_tokens(client, admin_headers):
+    old = login(client, "Reactivated User", "reactivated@example.com")
+    user_id = old["user"]["id"]
+
+    for is_active in (False, True):
+        response = client.put(f"/api/admin/users/{user_id}/active", json={"is_active": is_active}, headers=admin_headers)
+        assert response.status_code == 200, response.text
+
+    # Tokens issued before the deactivation stay revoked
+    assert client.get("/auth/me", headers=bearer(old["token"])).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": old["refresh_token"]}).status_code == 401
+
+    # A new login works
+    new = login(client, "Reactivated User", "reactivated@example.com")
+    assert client.get("/auth/me", headers=bearer(new["token"])).status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": new["refresh_token"]}).status_code == 200
+
+
+def test_user_listing_is_admin_only_and_matches_literal_prefixes(client, auth_headers, admin_headers):
+    assert client.get("/auth/users").status_code == 401
+    assert client.get("/auth/users", headers=auth_headers).status_code == 403
+
+    login(client, "Percent User", "percent_user@example.com")
+    response = client.get("/auth/users", params={"email": "%"}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == []
+
+    response = client.get("/auth/users", params={"email": "percent_"}, headers=admin_headers)
+    assert [user["email"] for user in response.json()] == ["percent_user@example.com"]
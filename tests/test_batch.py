@@ -0,0 +1,17 @@
+"""Calls whose responses can't be carried in a batch fail on their own."""
+
+
+def test_streaming_and_binary_calls_fail_per_item(client, admin_headers):
+    response = client.post("/api/batch", json={"requests": [
+        {"id": "categories", "path": "/api/categories/"},
+        {"id": "export", "path": "/api/admin/export/recipes?compress=true"},
+        {"id": "export-plain", "path": "/api/admin/export/categories"},
+    ]}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    categories, export, export_plain = response.json()["responses"]
+    assert categories["status"] == 200
+    assert isinstance(categories["body"], list) and categories["body"]
+    for item in (export, export_plain):
+        assert item["status"] == 406, item
+        assert "directly" in item["body"]["detail"]
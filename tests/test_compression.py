@@ -0,0 +1,31 @@
+"""Compressed responses decode to the plain body, whether compressed inline or on the threadpool."""
+import pytest
+import middleware.compression as compression
+from config.enviroment import settings
+
+
+@pytest.mark.parametrize("thread_min_size", [0, 10 ** 9])
+def test_gzip_round_trip(client, auth_headers, monkeypatch, thread_min_size):
+    offloaded = []
+
+    async def run_in_threadpool(func, *args):
+        offloaded.append(args[1:])
+        return func(*args)
+
+    monkeypatch.setattr(compression, "run_in_threadpool", run_in_threadpool)
+    monkeypatch.setattr(settings, "COMPRESSION_THREAD_MIN_SIZE", thread_min_size)
+    plain = client.get("/api/recipes/", headers={"Accept-Encoding": "identity"})
+    assert len(plain.content) >= settings.COMPRESSION_MIN_SIZE
+
+    # Anonymous (shared, cached) twice, then per-user (dynamic)
+    for headers in ({}, {}, auth_headers):
+        response = client.get("/api/recipes/", headers={"Accept-Encoding": "gzip", **headers})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == plain.content
+
+    if thread_min_size:
+        assert offloaded == []
+    else:
+        # The repeated shared page is a cache hit; the dynamic one uses the lower level
+        assert ("gzip", False) in offloaded
+        assert offloaded.count(("gzip", True)) <= 1
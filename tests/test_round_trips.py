@@ -0,0 +1,127 @@
+"""Statements per request for the write endpoints built on INSERT/UPDATE ... RETURNING.
+
+Each request gets a session on its own connection with a before_cursor_execute
+listener, so only the handler's statements are counted (not the token
+revocation sync or background jobs). The limits are the counts measured when
+the reloads were replaced with RETURNING rows; a change that adds a round trip
+to one of these paths should fail here.
+"""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import engine, get_db
+from utils.delivery import slot_scheduler
+
+
+class StatementCounter:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def reset(self):
+        self.statements.clear()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture()
+def counter(app):
+    counter = StatementCounter()
+
+    def counted_db():
+        with engine.connect() as conn:
+            event.listen(conn, "before_cursor_execute", counter)
+            db = Session(bind=conn, autoflush=False)
+            try:
+                yield db
+            finally:
+                db.close()
+
+    app.dependency_overrides[get_db] = counted_db
+    yield counter
+    app.dependency_overrides.pop(get_db, None)
+
+
+def _add_to_cart(client, auth_headers, recipe_id: int, people: int = 2) -> dict:
+    response = client.post("/api/cart/add", json={"recipe_id": recipe_id, "number_of_people": people}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_cart_add(client, auth_headers, counter):
+    counter.reset()
+    _add_to_cart(client, auth_headers, recipe_id=1)
+    assert counter.count <= 3, counter.statements
+
+    # Adding the same recipe again is the same upsert
+    counter.reset()
+    _add_to_cart(client, auth_headers, recipe_id=1)
+    assert counter.count <= 3, counter.statements
+
+
+def test_cart_update(client, auth_headers, counter):
+    item = _add_to_cart(client, auth_headers, recipe_id=2)
+
+    counter.reset()
+    response = client.put(f"/api/cart/item/{item['id']}", json={"number_of_people": 4}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["number_of_people"] == 4
+    assert counter.count <= 3, counter.statements
+
+
+def test_profile_update(client, auth_headers, counter):
+    counter.reset()
+    response = client.put("/auth/profile", json={"name": "Round Trip Updated"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["name"] == "Round Trip Updated"
+    assert counter.count <= 2, counter.statements
+
+
+def _create_order(client, auth_headers) -> dict:
+    order = {
+        "delivery_address": "Road 1, Manama",
+        "delivery_phone": "+97300000000",
+        "items": [{"recipe_id": 1, "number_of_people": 2}, {"recipe_id": 2, "number_of_people": 3}],
+    }
+    response = client.post("/api/orders/", json=order, headers=auth_headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_order_create(client, auth_headers, counter):
+    # Slot rows are reloaded every DELIVERY_SLOT_SYNC_SECONDS, not per order
+    slot_scheduler.sync()
+
+    counter.reset()
+    order = _create_order(client, auth_headers)
+    assert len(order["order_items"]) == 2
+    assert counter.count <= 5, counter.statements
+
+
+def test_order_status_change(client, auth_headers, counter):
+    slot_scheduler.sync()
+    order = _create_order(client, auth_headers)
+
+    counter.reset()
+    response = client.put(f"/api/orders/{order['id']}/status", params={"new_status": "confirmed"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "confirmed"
+    assert counter.count <= 3, counter.statements
+
+
+def test_register(client, counter):
+    counter.reset()
+    response = client.post("/auth/register", json={"name": "Counted User", "email": "counted@example.com", "password": "password123"})
+    assert response.status_code == 200, response.text
+    assert response.json()["email"] == "counted@example.com"
+    assert counter.count <= 1, counter.statements
+
+    # A duplicate is rejected by the unique constraint, not a lookup first
+    counter.reset()
+    response = client.post("/auth/register", json={"name": "Counted User", "email": "counted@example.com", "password": "password123"})
+    assert response.status_code == 400, response.text
+    assert counter.count <= 1, counter.statements
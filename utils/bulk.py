@@ -0,0 +1,96 @@
+import csv
+import io
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def _dialect_insert(conn, model):
+    """Dialect specific INSERT that supports ON CONFLICT, or None if unsupported"""
+    dialect = conn.dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(model)
+    if dialect == 'sqlite':
+        return sqlite.insert(model)
+    return None
+
+
+def insert_ignore(conn, model, rows, conflict_column=None, returning=()):
+    """INSERT ... ON CONFLICT DO NOTHING for the rows, in a single statement.
+
+    conflict_column=None skips rows that violate any unique constraint. With
+    returning columns, the rows that were actually inserted are returned.
+    """
+    if not rows:
+        return []
+    stmt = _dialect_insert(conn, model)
+    if stmt is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[conflict_column] if conflict_column else None)
+    elif conflict_column is None:
+        raise NotImplementedError(f"Insert ignoring any conflict is not supported on {conn.dialect.name}")
+    else:
+        # No portable upsert - filter out existing keys with one query instead
+        column = getattr(model, conflict_column)
+        keys = [row[conflict_column] for row in rows]
+        existing = set(conn.execute(select(column).where(column.in_(keys))).scalars())
+        rows = [row for row in rows if row[conflict_column] not in existing]
+        if not rows:
+            return []
+        stmt = insert(model)
+    if returning:
+        return conn.execute(stmt.returning(*[getattr(model, column) for column in returning]), rows).all()
+    conn.execute(stmt, rows)
+
+
+def upsert_statement(conn, model, conflict_columns, update_columns):
+    """INSERT ... ON CONFLICT DO UPDATE of update_columns, ready to execute (or add RETURNING to)"""
+    stmt = _dialect_insert(conn, model)
+    if stmt is None:
+        raise NotImplementedError(f"Upsert is not supported on {conn.dialect.name}")
+    if isinstance(conflict_columns, str):
+        conflict_columns = [conflict_columns]
+    return stmt.on_conflict_do_update(
+        index_elements=conflict_columns,
+        set_={column: getattr(stmt.excluded, column) for column in update_columns}
+    )
+
+
+def upsert(conn, model, rows, conflict_columns, update_columns):
+    """INSERT ... ON CONFLICT DO UPDATE of update_columns, in a single statement"""
+    if not rows:
+        return
+    conn.execute(upsert_statement(conn, model, conflict_columns, update_columns), rows)
+
+
+def bulk_insert(conn, model, rows):
+    """Insert many new rows - COPY on psycopg2/Postgres, executemany elsewhere"""
+    if not rows:
+        return
+    if conn.dialect.name == 'postgresql' and conn.dialect.driver == 'psycopg2':
+        columns = list(rows[0].keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(['' if row[column] is None else row[column] for column in columns])
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        return
+    conn.execute(insert(model), rows)
+
+
+def next_id(conn, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def sync_sequence(conn, model):
+    """Move the Postgres serial sequence past ids we inserted explicitly"""
+    if conn.dialect.name != 'postgresql':
+        return
+    table = model.__tablename__
+    conn.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+        f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+    ))
@@ -0,0 +1,125 @@
+"""Background purge of abandoned cart items.
+
+Cart rows not touched for CART_RETENTION_DAYS (by updated_at), and rows whose
+recipe is no longer available, are deleted in batches of CART_PURGE_BATCH_SIZE.
+Each batch selects a handful of ids and deletes them in its own short
+transaction, then sleeps CART_PURGE_BATCH_PAUSE_MS, so the purge never holds
+locks for long or starves the cart endpoints of the database. A run starts every
+CART_PURGE_INTERVAL_SECONDS; several workers running it at once only makes
+their deletes overlap, which is harmless.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select
+from config.enviroment import settings
+from database import SessionLocal
+from models.cart import CartItem
+from models.recipe import Recipe
+
+# Why a row was purged, in the order each run handles them
+REASONS = ("stale", "unavailable")
+
+
+class CartPurger:
+    def __init__(self, retention_days: int, batch_size: int, batch_pause_ms: int, interval_seconds: int):
+        self.retention = timedelta(days=retention_days) if retention_days > 0 else None
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause_ms / 1000
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._removed = {reason: 0 for reason in REASONS}
+        self._runs = 0
+        self._batches = 0
+        self._errors = 0
+        self._last_run = None
+
+    def _conditions(self, now: datetime):
+        if self.retention is not None:
+            yield "stale", CartItem.updated_at < now - self.retention
+        yield "unavailable", CartItem.recipe_id.in_(select(Recipe.id).where(Recipe.is_available.is_(False)))
+
+    def _delete_batch(self, condition) -> int:
+        with SessionLocal() as db:
+            ids = db.execute(
+                select(CartItem.id).where(condition).order_by(CartItem.id).limit(self.batch_size)
+            ).scalars().all()
+            if not ids:
+                return 0
+            # Recheck the condition so a row touched since the select survives
+            deleted = db.execute(
+                delete(CartItem).where(CartItem.id.in_(ids), condition)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        return deleted
+
+    def run_once(self) -> dict:
+        """Purge everything currently eligible; returns rows removed per reason"""
+        with self._run_lock:
+            started = time.monotonic()
+            removed = {reason: 0 for reason in REASONS}
+            for reason, condition in self._conditions(datetime.now(timezone.utc)):
+                while not self._stop.is_set():
+                    deleted = self._delete_batch(condition)
+                    with self._lock:
+                        self._batches += 1
+                        self._removed[reason] += deleted
+                    removed[reason] += deleted
+                    if deleted < self.batch_size:
+                        break
+                    self._stop.wait(self.batch_pause)
+
+            with self._lock:
+                self._runs += 1
+                self._last_run = {
+                    "finished_at": datetime.now(timezone.utc),
+                    "duration_ms": round((time.monotonic() - started) * 1000, 1),
+                    "removed": removed,
+                }
+            return removed
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                with self._lock:
+                    self._errors += 1
+
+    def start(self):
+        """Run the purge every interval in a daemon thread"""
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="cart-purge", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "retention_days": self.retention.days if self.retention else None,
+                "interval_seconds": self.interval_seconds,
+                "runs": self._runs,
+                "batches": self._batches,
+                "errors": self._errors,
+                "removed": dict(self._removed),
+                "last_run": self._last_run,
+            }
+
+
+cart_purger = CartPurger(
+    retention_days=settings.CART_RETENTION_DAYS,
+    batch_size=settings.CART_PURGE_BATCH_SIZE,
+    batch_pause_ms=settings.CART_PURGE_BATCH_PAUSE_MS,
+    interval_seconds=settings.CART_PURGE_INTERVAL_SECONDS,
+)
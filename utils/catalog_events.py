@@ -0,0 +1,34 @@
+import threading
+from typing import Callable, Iterable, List
+
+# In-process catalog change notifications. Readers that keep derived catalog
+# state (caches, indexes) register a listener and refresh when it fires.
+_lock = threading.Lock()
+_listeners: List[Callable] = []
+_version = 0
+
+
+def on_catalog_change(callback: Callable) -> Callable:
+    """Register callback(recipe_ids, category_ids) - usable as a decorator"""
+    with _lock:
+        _listeners.append(callback)
+    return callback
+
+
+def catalog_version() -> int:
+    return _version
+
+
+def notify_catalog_change(recipe_ids: Iterable[int] = (), category_ids: Iterable[int] = ()) -> int:
+    """Bump the catalog version and tell every listener what changed"""
+    global _version
+    recipe_ids = set(recipe_ids)
+    category_ids = set(category_ids)
+    with _lock:
+        _version += 1
+        version = _version
+        listeners = list(_listeners)
+
+    for listener in listeners:
+        listener(recipe_ids, category_ids)
+    return version
@@ -0,0 +1,216 @@
+"""Capacity-aware delivery slot scheduling.
+
+Delivery windows of DELIVERY_SLOT_MINUTES are rows in delivery_slots with a
+capacity and a booked count; the database is the source of truth. Booking is a
+conditional UPDATE (booked < capacity) in the order's transaction, so workers
+can never overbook a slot between them. Each worker keeps a min-heap of slots it
+believes have room, so picking the earliest candidate is O(log n); a slot that
+turns out to be full is dropped and the next one tried. A background thread
+(started with the app) reloads free slots every DELIVERY_SLOT_SYNC_SECONDS,
+which also creates slots as the booking horizon moves forward and picks up
+capacity released on other workers; listing availability is a plain SELECT.
+"""
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from config.enviroment import settings
+from database import SessionLocal
+from models.delivery import DeliverySlot
+from utils.bulk import insert_ignore
+
+
+class BookedSlot(NamedTuple):
+    id: int
+    starts_at: datetime
+    ends_at: datetime
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything here is UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SlotScheduler:
+    def __init__(self, slot_minutes: int, capacity: int, lead_minutes: int, horizon_hours: int, sync_seconds: int):
+        self.slot_length = timedelta(minutes=slot_minutes)
+        self.capacity = capacity
+        self.lead = timedelta(minutes=lead_minutes)
+        self.horizon = timedelta(hours=horizon_hours)
+        self.sync_seconds = sync_seconds
+        self._lock = threading.Lock()
+        self._heap = []         # (starts_at, slot_id) of slots believed to have room
+        self._queued = set()    # slot ids currently in the heap
+        self._synced_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def slot_start(self, when: datetime) -> datetime:
+        """Start of the window containing `when`"""
+        seconds = self.slot_length.total_seconds()
+        return datetime.fromtimestamp(int(_utc(when).timestamp() // seconds) * seconds, timezone.utc)
+
+    def earliest_start(self, now: datetime = None) -> datetime:
+        """First window that still leaves the kitchen its lead time"""
+        ready_at = (now or _now()) + self.lead
+        start = self.slot_start(ready_at)
+        return start if start >= ready_at else start + self.slot_length
+
+    def ensure_slots(self, db: Session):
+        """Create the slot rows between now and the booking horizon (idempotent)"""
+        start = self.earliest_start()
+        end = start + self.horizon
+        rows = []
+        while start < end:
+            rows.append({"starts_at": start, "capacity": self.capacity, "booked": 0})
+            start += self.slot_length
+        insert_ignore(db.connection(), DeliverySlot, rows, "starts_at")
+
+    def sync(self, db: Session = None):
+        """Reload the free slots; with db, inside the caller's transaction"""
+        if db is None:
+            with SessionLocal() as db:
+                self.sync(db)
+                db.commit()
+            return
+        self.ensure_slots(db)
+        free = db.execute(
+            select(DeliverySlot.starts_at, DeliverySlot.id).where(
+                DeliverySlot.starts_at >= self.earliest_start(),
+                DeliverySlot.booked < DeliverySlot.capacity
+            )
+        ).all()
+        heap = [(_utc(starts_at), slot_id) for starts_at, slot_id in free]
+        heapq.heapify(heap)
+        with self._lock:
+            self._heap = heap
+            self._queued = {slot_id for _, slot_id in heap}
+            self._synced_at = time.monotonic()
+
+    def _maybe_sync(self, db: Session):
+        if self._synced_at is not None and time.monotonic() - self._synced_at < self.sync_seconds:
+            return
+        with self._lock:
+            if self._synced_at is not None and time.monotonic() - self._synced_at < self.sync_seconds:
+                return
+            # Claim this sync so concurrent checkouts keep using the current heap
+            self._synced_at = time.monotonic()
+        self.sync(db)
+
+    def _candidate(self, earliest: datetime):
+        """Earliest queued slot at or after `earliest`; past slots are popped for good"""
+        with self._lock:
+            while self._heap and self._heap[0][0] < earliest:
+                _, slot_id = heapq.heappop(self._heap)
+                self._queued.discard(slot_id)
+            return self._heap[0] if self._heap else None
+
+    def _drop(self, slot_id: int):
+        with self._lock:
+            if self._heap and self._heap[0][1] == slot_id:
+                heapq.heappop(self._heap)
+                self._queued.discard(slot_id)
+            elif slot_id in self._queued:
+                # Rare: another request already moved past it - O(n) removal
+                self._queued.discard(slot_id)
+                self._heap = [entry for entry in self._heap if entry[1] != slot_id]
+                heapq.heapify(self._heap)
+
+    def book(self, db: Session) -> Optional[BookedSlot]:
+        """Take one unit of the earliest slot with room, inside the caller's transaction"""
+        # Syncs share the caller's transaction: on SQLite a second connection
+        # would wait on the write lock this transaction may already hold
+        self._maybe_sync(db)
+        earliest = self.earliest_start()
+        resynced = False
+        while True:
+            candidate = self._candidate(earliest)
+            if candidate is None:
+                if resynced:
+                    return None
+                # Heap ran dry - other workers may have freed or created slots
+                self.sync(db)
+                resynced = True
+                continue
+
+            starts_at, slot_id = candidate
+            booked = db.execute(
+                update(DeliverySlot)
+                .where(DeliverySlot.id == slot_id, DeliverySlot.booked < DeliverySlot.capacity)
+                .values(booked=DeliverySlot.booked + 1)
+                .returning(DeliverySlot.booked, DeliverySlot.capacity)
+                .execution_options(synchronize_session=False)
+            ).first()
+
+            if booked is None or booked.booked >= booked.capacity:
+                # Full now (possibly filled by another worker) - stop offering it
+                self._drop(slot_id)
+            if booked is not None:
+                return BookedSlot(slot_id, starts_at, starts_at + self.slot_length)
+
+    def release(self, db: Session, slot_id: int):
+        """Give back a booking (order cancelled), inside the caller's transaction"""
+        released = db.execute(
+            update(DeliverySlot)
+            .where(DeliverySlot.id == slot_id, DeliverySlot.booked > 0)
+            .values(booked=DeliverySlot.booked - 1)
+            .returning(DeliverySlot.starts_at)
+            .execution_options(synchronize_session=False)
+        ).first()
+        return _utc(released.starts_at) if released else None
+
+    def requeue(self, slot_id: int, starts_at: datetime):
+        """Offer a slot again after a committed release"""
+        if starts_at < self.earliest_start():
+            return
+        with self._lock:
+            if slot_id not in self._queued:
+                heapq.heappush(self._heap, (starts_at, slot_id))
+                self._queued.add(slot_id)
+
+    def availability(self, db: Session, hours: int):
+        """Slots from the earliest bookable one through the next `hours` (rows created by sync)"""
+        start = self.earliest_start()
+        return db.query(DeliverySlot).filter(
+            DeliverySlot.starts_at >= start,
+            DeliverySlot.starts_at < start + timedelta(hours=hours)
+        ).order_by(DeliverySlot.starts_at.asc()).all()
+
+    def _loop(self):
+        while True:
+            try:
+                self.sync()
+            except Exception:
+                pass  # retried next interval; checkouts also sync when their heap runs dry
+            if self._stop.wait(self.sync_seconds):
+                return
+
+    def start(self):
+        """Create slots and reload free ones now and every sync interval, in a daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="delivery-slots", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+slot_scheduler = SlotScheduler(
+    slot_minutes=settings.DELIVERY_SLOT_MINUTES,
+    capacity=settings.DELIVERY_SLOT_CAPACITY,
+    lead_minutes=settings.DELIVERY_LEAD_MINUTES,
+    horizon_hours=settings.DELIVERY_HORIZON_HOURS,
+    sync_seconds=settings.DELIVERY_SLOT_SYNC_SECONDS,
+)
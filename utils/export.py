@@ -0,0 +1,123 @@
+"""Streaming NDJSON export of catalog and order data.
+
+Rows are read through server-side cursors (stream_results + yield_per) and
+encoded one line at a time, so memory stays flat regardless of table size.
+
+    python -m utils.export recipes recipes.ndjson
+    python -m utils.export orders orders.ndjson.gz
+"""
+import json
+import sys
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import select
+from database import engine
+from models.recipe import Recipe
+from models.category import Category
+from models.order import Order, OrderItem
+from models.user import UserModel, USER_PUBLIC_COLUMNS
+from config.enviroment import settings
+
+ORDER_ITEM_COLUMNS = ["id", "recipe_id", "number_of_people", "unit_price", "calculated_price"]
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stream(conn, stmt, batch_size):
+    return conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt).mappings()
+
+
+def iter_recipes(conn, batch_size):
+    for row in _stream(conn, select(Recipe.__table__).order_by(Recipe.id), batch_size):
+        yield dict(row)
+
+
+def iter_categories(conn, batch_size):
+    for row in _stream(conn, select(Category.__table__).order_by(Category.id), batch_size):
+        yield dict(row)
+
+
+def iter_users(conn, batch_size):
+    columns = [UserModel.__table__.c[column] for column in USER_PUBLIC_COLUMNS]
+    for row in _stream(conn, select(*columns).order_by(UserModel.id), batch_size):
+        yield dict(row)
+
+
+def iter_orders(conn, batch_size):
+    """Orders with their items, grouped from one ordered LEFT JOIN cursor"""
+    item_columns = [getattr(OrderItem, column).label(f"item_{column}") for column in ORDER_ITEM_COLUMNS]
+    stmt = (
+        select(Order.__table__, *item_columns)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .order_by(Order.id, OrderItem.id)
+    )
+
+    current = None
+    for row in _stream(conn, stmt, batch_size):
+        if current is None or current["id"] != row["id"]:
+            if current is not None:
+                yield current
+            current = {column: row[column] for column in Order.__table__.columns.keys()}
+            current["order_items"] = []
+        if row["item_id"] is not None:
+            current["order_items"].append({column: row[f"item_{column}"] for column in ORDER_ITEM_COLUMNS})
+    if current is not None:
+        yield current
+
+
+EXPORTS = {
+    "recipes": iter_recipes,
+    "categories": iter_categories,
+    "orders": iter_orders,
+    "users": iter_users,
+}
+
+
+def stream_export(dataset: str, compress: bool = False, batch_size: int = None, flush_bytes: int = 64 * 1024):
+    """Yield NDJSON (optionally gzipped) byte chunks for a dataset"""
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = []
+    buffered = 0
+
+    def drain():
+        data = b"".join(buffer)
+        buffer.clear()
+        return compressor.compress(data) if compressor else data
+
+    # Own connection, so the stream outlives the request's session
+    with engine.connect() as conn:
+        for row in EXPORTS[dataset](conn, batch_size):
+            line = json.dumps(row, default=_json_default, separators=(",", ":")).encode() + b"\n"
+            buffer.append(line)
+            buffered += len(line)
+            if buffered >= flush_bytes:
+                buffered = 0
+                chunk = drain()
+                if chunk:
+                    yield chunk
+
+    chunk = drain()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in EXPORTS:
+        print(f"Usage: python -m utils.export [{'|'.join(EXPORTS)}] OUTPUT_FILE[.gz]")
+        sys.exit(1)
+
+    dataset, output = sys.argv[1], sys.argv[2]
+    with open(output, "wb") as f:
+        for chunk in stream_export(dataset, compress=output.endswith(".gz")):
+            f.write(chunk)
+    print(f"Exported {dataset} to {output}")
@@ -0,0 +1,166 @@
+"""Sparse fieldsets: ?fields=id,name,category.name
+
+A selection is a nested dict of field name -> None (plain value) or the
+selection inside a nested object; naming a nested object without a sub-path
+selects all of it. Selections are checked against the response schema, turned
+into load_only/joinedload options so only the selected columns and
+relationships are queried, and serialized with a schema trimmed to the same
+fields, so values (Decimals, enums, datetimes) render exactly as in the full
+response.
+"""
+import types
+from functools import lru_cache
+from typing import Optional, Union, get_args, get_origin
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only
+from utils.responses import FastJSONResponse
+
+MAX_FIELDS = 100
+
+
+def _nested_model(annotation):
+    """The pydantic model inside Model / Optional[Model] / List[Model], if any"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        model = _nested_model(arg)
+        if model is not None:
+            return model
+    return None
+
+
+def _all_fields(schema) -> dict:
+    return {
+        name: _all_fields(nested) if (nested := _nested_model(field.annotation)) else None
+        for name, field in schema.model_fields.items()
+    }
+
+
+def parse_fields(value: Optional[str], schema) -> Optional[dict]:
+    """Parse a comma separated list of dotted paths into a selection, None when absent"""
+    if value is None or not value.strip():
+        return None
+    paths = [path.strip() for path in value.split(",") if path.strip()]
+    if len(paths) > MAX_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_FIELDS} fields can be selected"
+        )
+
+    selection = {}
+    unknown = []
+    for path in paths:
+        node, current = selection, schema
+        names = path.split(".")
+        for depth, name in enumerate(names):
+            field = current.model_fields.get(name) if current else None
+            if field is None:
+                unknown.append(path)
+                break
+            nested = _nested_model(field.annotation)
+            if depth == len(names) - 1:
+                node[name] = _all_fields(nested) if nested else None
+            else:
+                if nested is None:
+                    unknown.append(path)
+                    break
+                node = node.setdefault(name, {})
+                current = nested
+
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return selection
+
+
+def sparse_fields(schema):
+    """Dependency reading ?fields= for responses of the given schema"""
+    def dependency(
+        fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. id,name,category.name")
+    ) -> Optional[dict]:
+        return parse_fields(fields, schema)
+    return dependency
+
+
+def with_paths(selection: dict, *paths: str) -> dict:
+    """Copy of a selection with extra dotted paths, e.g. columns needed to compute a selected value"""
+    selection = _thaw(_freeze(selection))
+    for path in paths:
+        node = selection
+        *parents, leaf = path.split(".")
+        for name in parents:
+            if node.get(name) is None:
+                node[name] = {}
+            node = node[name]
+        node.setdefault(leaf, None)
+    return selection
+
+
+def loader_options(model, selection: dict) -> list:
+    """load_only for the selected columns, joinedload for selected relationships"""
+    mapper = inspect(model)
+    columns = [getattr(model, name) for name in selection if name in mapper.column_attrs]
+    options = [load_only(*(columns or [getattr(model, column.key) for column in mapper.primary_key]))]
+    for name, nested in selection.items():
+        if nested is not None and name in mapper.relationships:
+            target = mapper.relationships[name].mapper.class_
+            options.append(joinedload(getattr(model, name)).options(*loader_options(target, nested)))
+    return options
+
+
+def _freeze(selection: dict):
+    return tuple(sorted(
+        (name, None if nested is None else _freeze(nested)) for name, nested in selection.items()
+    ))
+
+
+def _thaw(frozen) -> dict:
+    return {name: None if nested is None else _thaw(nested) for name, nested in frozen}
+
+
+def _replace_model(annotation, model):
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return model
+    origin = get_origin(annotation)
+    if origin is None:
+        return annotation
+    args = tuple(_replace_model(arg, model) for arg in get_args(annotation))
+    if origin in (Union, types.UnionType):
+        return Union[args]
+    return origin[args]
+
+
+@lru_cache(maxsize=256)
+def _partial_model(schema, frozen):
+    selected = dict(frozen)
+    fields = {}
+    # Keep the schema's field order
+    for name in [name for name in schema.model_fields if name in selected]:
+        nested = selected[name]
+        field = schema.model_fields[name]
+        annotation = field.annotation
+        if nested is not None:
+            annotation = _replace_model(annotation, _partial_model(_nested_model(annotation), nested))
+        fields[name] = (annotation, field)
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **fields
+    )
+
+
+def partial_model(schema, selection: dict):
+    """Schema with only the selected fields (cached per selection)"""
+    return _partial_model(schema, _freeze(selection))
+
+
+def sparse_response(schema, selection: dict, data) -> FastJSONResponse:
+    """Serialize ORM objects or dicts (or a list of them) with only the selected fields"""
+    model = partial_model(schema, selection)
+    if isinstance(data, list):
+        return FastJSONResponse([model.model_validate(item) for item in data])
+    return FastJSONResponse(model.model_validate(data))
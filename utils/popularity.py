@@ -0,0 +1,180 @@
+"""Recipe popularity rankings over sliding windows (24h, 7d, all time).
+
+Each worker keeps hourly order counts per recipe for the longest window plus an
+all-time count. create_order adds to them and cancelling an order through
+update_order_status takes its items back out; hourly buckets older than the
+longest window are dropped, so the windowed counts decay on their own. Sorted
+rankings, overall and per category, are recomputed from the counters at most
+every POPULARITY_REFRESH_SECONDS (or when the hour rolls over). A full rebuild
+from order_items starts in the background when the app starts (rankings are
+empty until it finishes) and runs again every POPULARITY_REBUILD_SECONDS,
+picking up orders placed through other workers.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy import Integer, cast, func, select
+from config.enviroment import settings
+from database import SessionLocal
+from models.order import Order, OrderItem
+from models.recipe import Recipe
+from utils.catalog_events import on_catalog_change
+
+# Window name -> length in hours, None for all time
+WINDOWS = {"24h": 24, "7d": 24 * 7, "all": None}
+MAX_WINDOW_HOURS = max(hours for hours in WINDOWS.values() if hours)
+
+
+def _hour(when: datetime) -> int:
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp() // 3600)
+
+
+def _hour_bucket(column, dialect: str):
+    """SQL expression for hours since the epoch"""
+    if dialect == "sqlite":
+        return cast(func.strftime("%s", column), Integer) / 3600
+    return cast(func.floor(func.extract("epoch", column) / 3600), Integer)
+
+
+class PopularityIndex:
+    def __init__(self, refresh_seconds: int, rebuild_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._hourly = {}    # recipe_id -> {hour: orders}, last MAX_WINDOW_HOURS only
+        self._all_time = {}  # recipe_id -> orders
+        self._category = {}  # recipe_id -> category_id
+        self._rankings = {}  # (window, category_id or None) -> tuple of recipe ids, most ordered first
+        self._ranked_at = (0.0, 0)  # (monotonic time, hour) the rankings were computed at
+        self._built_at = None
+        self._rebuilding = False
+
+    def rebuild(self):
+        """Recount from order_items, ignoring cancelled orders"""
+        now_hour = _hour(datetime.now(timezone.utc))
+        since = datetime.fromtimestamp((now_hour - MAX_WINDOW_HOURS + 1) * 3600, timezone.utc)
+        with SessionLocal() as db:
+            bucket = _hour_bucket(Order.order_date, db.get_bind().dialect.name)
+            counted = Order.status != "cancelled"
+            recent = db.execute(
+                select(OrderItem.recipe_id, bucket, func.count())
+                .join(Order, Order.id == OrderItem.order_id)
+                .where(counted, Order.order_date >= since)
+                .group_by(OrderItem.recipe_id, bucket)
+            ).all()
+            all_time = db.execute(
+                select(OrderItem.recipe_id, func.count())
+                .join(Order, Order.id == OrderItem.order_id)
+                .where(counted)
+                .group_by(OrderItem.recipe_id)
+            ).all()
+            categories = db.execute(select(Recipe.id, Recipe.category_id)).all()
+
+        hourly = {}
+        for recipe_id, hour, count in recent:
+            hourly.setdefault(recipe_id, {})[int(hour)] = count
+
+        with self._lock:
+            self._hourly = hourly
+            self._all_time = dict(all_time)
+            self._category = dict(categories)
+            self._rankings = {}
+            self._built_at = time.monotonic()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        finally:
+            self._rebuilding = False
+
+    def _maybe_rebuild(self):
+        if self._rebuilding:
+            return
+        if self._built_at is not None and time.monotonic() - self._built_at < self.rebuild_seconds:
+            return
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        # Keep serving the current index (empty before the first build) while the new one is built
+        threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+
+    def start(self):
+        """Begin the first build in the background (app startup); lookups return nothing until it is done"""
+        self._maybe_rebuild()
+
+    def record_order(self, items, order_date: datetime, delta: int = 1):
+        """Count an order's (recipe_id, category_id) items; delta=-1 when it is cancelled"""
+        if self._built_at is None:
+            return
+        hour = _hour(order_date)
+        in_window = hour > _hour(datetime.now(timezone.utc)) - MAX_WINDOW_HOURS
+        with self._lock:
+            for recipe_id, category_id in items:
+                self._category[recipe_id] = category_id
+                self._all_time[recipe_id] = max(0, self._all_time.get(recipe_id, 0) + delta)
+                if in_window:
+                    buckets = self._hourly.setdefault(recipe_id, {})
+                    buckets[hour] = max(0, buckets.get(hour, 0) + delta)
+
+    def invalidate(self):
+        """Force a background rebuild on next use (e.g. recipes moved between categories)"""
+        if self._built_at is not None:
+            self._built_at = time.monotonic() - self.rebuild_seconds
+
+    def _refresh_rankings(self):
+        now_hour = _hour(datetime.now(timezone.utc))
+        ranked_at, ranked_hour = self._ranked_at
+        if self._rankings and ranked_hour == now_hour and time.monotonic() - ranked_at < self.refresh_seconds:
+            return
+
+        with self._lock:
+            # Drop buckets that fell out of the longest window
+            oldest = now_hour - MAX_WINDOW_HOURS
+            for recipe_id, buckets in list(self._hourly.items()):
+                for hour in [hour for hour in buckets if hour <= oldest]:
+                    del buckets[hour]
+                if not buckets:
+                    del self._hourly[recipe_id]
+
+            rankings = {}
+            for window, hours in WINDOWS.items():
+                if hours is None:
+                    counts = dict(self._all_time)
+                else:
+                    counts = {
+                        recipe_id: sum(count for hour, count in buckets.items() if hour > now_hour - hours)
+                        for recipe_id, buckets in self._hourly.items()
+                    }
+                ranked = sorted(
+                    (recipe_id for recipe_id, count in counts.items() if count > 0),
+                    key=lambda recipe_id: (-counts[recipe_id], recipe_id)
+                )
+                rankings[(window, None)] = tuple(ranked)
+                by_category = {}
+                for recipe_id in ranked:
+                    by_category.setdefault(self._category.get(recipe_id), []).append(recipe_id)
+                for category_id, recipe_ids in by_category.items():
+                    rankings[(window, category_id)] = tuple(recipe_ids)
+
+            self._rankings = rankings
+            self._ranked_at = (time.monotonic(), now_hour)
+
+    def ranking(self, window: str, category_id: int = None) -> tuple:
+        """Recipe ids with at least one order in the window, most ordered first"""
+        self._maybe_rebuild()
+        self._refresh_rankings()
+        return self._rankings.get((window, category_id), ())
+
+
+popularity = PopularityIndex(
+    refresh_seconds=settings.POPULARITY_REFRESH_SECONDS,
+    rebuild_seconds=settings.POPULARITY_REBUILD_SECONDS,
+)
+
+
+@on_catalog_change
+def _on_catalog_change(recipe_ids, category_ids):
+    popularity.invalidate()
@@ -0,0 +1,99 @@
+"""Related recipes ("frequently ordered together").
+
+Each worker keeps, per recipe, how many orders contained it together with every
+other recipe, plus a precomputed top-K list so lookups are a dict access.
+create_order feeds new orders in as they are written. A full rebuild from
+order_items starts in a background thread when the app starts (lookups return
+nothing until it finishes) and runs again every RELATED_REBUILD_SECONDS, which
+also picks up orders placed through other workers. Requests never wait on it.
+"""
+import threading
+import time
+from itertools import combinations
+from sqlalchemy import and_, distinct, func, select
+from sqlalchemy.orm import aliased
+from config.enviroment import settings
+from database import SessionLocal
+from models.order import OrderItem
+
+
+class RelatedRecipesIndex:
+    def __init__(self, top_k: int, rebuild_seconds: int):
+        self.top_k = top_k
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._pairs = {}  # recipe_id -> {other_recipe_id: orders containing both}
+        self._top = {}    # recipe_id -> ((other_recipe_id, count), ...) best first
+        self._built_at = None
+        self._rebuilding = False
+
+    def _top_for(self, counts: dict) -> tuple:
+        best = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:self.top_k]
+        return tuple(best)
+
+    def rebuild(self):
+        """Recount every pair from order_items with one self-join aggregate"""
+        first, second = aliased(OrderItem), aliased(OrderItem)
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(first.recipe_id, second.recipe_id, func.count(distinct(first.order_id)))
+                .join(second, and_(first.order_id == second.order_id, first.recipe_id != second.recipe_id))
+                .group_by(first.recipe_id, second.recipe_id)
+            ).all()
+
+        pairs = {}
+        for recipe_id, other_id, count in rows:
+            pairs.setdefault(recipe_id, {})[other_id] = count
+        top = {recipe_id: self._top_for(counts) for recipe_id, counts in pairs.items()}
+
+        with self._lock:
+            self._pairs = pairs
+            self._top = top
+            self._built_at = time.monotonic()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        finally:
+            self._rebuilding = False
+
+    def _maybe_rebuild(self):
+        if self._rebuilding:
+            return
+        if self._built_at is not None and time.monotonic() - self._built_at < self.rebuild_seconds:
+            return
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        # Keep serving the current index (empty before the first build) while the new one is built
+        threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+
+    def start(self):
+        """Begin the first build in the background (app startup); lookups return nothing until it is done"""
+        self._maybe_rebuild()
+
+    def record_order(self, recipe_ids):
+        """Count a newly written order; only recipes in the order need a new top-K"""
+        recipe_ids = sorted(set(recipe_ids))
+        if len(recipe_ids) < 2 or self._built_at is None:
+            return
+        with self._lock:
+            for recipe_id, other_id in combinations(recipe_ids, 2):
+                counts = self._pairs.setdefault(recipe_id, {})
+                counts[other_id] = counts.get(other_id, 0) + 1
+                counts = self._pairs.setdefault(other_id, {})
+                counts[recipe_id] = counts.get(recipe_id, 0) + 1
+            for recipe_id in recipe_ids:
+                self._top[recipe_id] = self._top_for(self._pairs[recipe_id])
+
+    def related(self, recipe_id: int) -> tuple:
+        """((recipe_id, times_ordered_together), ...) best first, up to top_k"""
+        self._maybe_rebuild()
+        return self._top.get(recipe_id, ())
+
+
+related_recipes = RelatedRecipesIndex(
+    top_k=settings.RELATED_TOP_K,
+    rebuild_seconds=settings.RELATED_REBUILD_SECONDS,
+)
@@ -0,0 +1,53 @@
+"""Fast JSON response class.
+
+Renders straight to bytes: Pydantic models (and lists of them) with their own
+compiled serializer, anything else with orjson when it is installed, else with
+pydantic-core's Rust encoder. Decimal and datetime are encoded natively, so
+nothing goes through jsonable_encoder first, and values render as in FastAPI's
+own response_model serialization: Decimal as a string ("8.50"), UTC datetimes
+with a Z suffix.
+
+main.py installs it as the app's default response class wrapped in Default(),
+which keeps FastAPI's own fast path (response_model serialized by Pydantic
+directly to bytes) for routes that declare a response model, and uses this
+class for everything else, including responses the handlers build themselves.
+"""
+from decimal import Decimal
+from typing import Any
+import pydantic_core
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional - pydantic-core's encoder without it
+    orjson = None
+
+
+def _orjson_default(value):
+    """Types orjson doesn't encode itself"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _model_json(model: BaseModel) -> bytes:
+    # The model's own compiled serializer, straight to bytes
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def dumps(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        return _model_json(content)
+    if isinstance(content, list) and content and all(isinstance(item, BaseModel) for item in content):
+        return b"[" + b",".join(_model_json(item) for item in content) + b"]"
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return pydantic_core.to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
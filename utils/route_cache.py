@@ -0,0 +1,172 @@
+"""Response cache for GET routes with single-flight stampede protection.
+
+@cached_route() sits under @router.get(...) on a sync handler. Results are
+keyed on the request path, its query parameters and, with per_user=True, the
+caller's id; they live for ROUTE_CACHE_TTL_SECONDS in an LRU of at most
+ROUTE_CACHE_MAX_ENTRIES. When a key is missing, the first request computes it
+and concurrent requests for the same key wait for that result (or exception)
+instead of all querying the database; a waiter that gives up after
+ROUTE_CACHE_WAIT_SECONDS computes the value itself. The cache is per worker and
+is cleared on catalog changes; results computed while a clear happened are not
+stored. Hit, miss and coalesce counters are served at
+/api/admin/maintenance/route-cache.
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from fastapi import Request, Response
+from config.enviroment import settings
+from utils.catalog_events import on_catalog_change
+from utils.tokens import TokenPrincipal
+
+
+class _Flight:
+    """One in-progress computation that other requests can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class _CachedResponse:
+    """A Response stored as bytes, rebuilt for every hit so no request shares the instance"""
+
+    def __init__(self, response: Response):
+        self.body = response.body
+        self.status_code = response.status_code
+        self.raw_headers = list(response.raw_headers)
+
+    def build(self) -> Response:
+        response = Response(content=self.body, status_code=self.status_code)
+        response.raw_headers = list(self.raw_headers)
+        return response
+
+
+class RouteCache:
+    def __init__(self, ttl_seconds: int, max_entries: int, wait_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._flights = {}             # key -> _Flight
+        self._generation = 0           # bumped by clear()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute, ttl_seconds: int = None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                generation = self._generation
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if flight.done.wait(self.wait_seconds):
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value
+            # The computation is stuck - don't queue behind it any longer
+            return compute()
+
+        try:
+            flight.value = compute()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                if flight.error is None and generation == self._generation:
+                    self._entries[key] = (time.monotonic() + (ttl_seconds or self.ttl_seconds), flight.value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+            flight.done.set()
+        return flight.value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.ROUTE_CACHE_ENABLED,
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries,
+                "entries": len(self._entries),
+                "in_flight": len(self._flights),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
+
+
+route_cache = RouteCache(
+    ttl_seconds=settings.ROUTE_CACHE_TTL_SECONDS,
+    max_entries=settings.ROUTE_CACHE_MAX_ENTRIES,
+    wait_seconds=settings.ROUTE_CACHE_WAIT_SECONDS,
+)
+
+
+@on_catalog_change
+def _on_catalog_change(recipe_ids, category_ids):
+    route_cache.clear()
+
+
+def _cache_key(request: Request, kwargs: dict, per_user: bool):
+    user_id = None
+    if per_user:
+        user_id = next((value.id for value in kwargs.values() if isinstance(value, TokenPrincipal)), None)
+    return (request.url.path, tuple(sorted(request.query_params.multi_items())), user_id)
+
+
+def cached_route(ttl_seconds: int = None, per_user: bool = False):
+    """Cache a sync GET handler's result; per_user=True keys on the caller's principal too"""
+    def decorator(handler):
+        signature = inspect.signature(handler)
+        takes_request = "request" in signature.parameters
+
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            request = kwargs["request"] if takes_request else kwargs.pop("request")
+            if not settings.ROUTE_CACHE_ENABLED:
+                return handler(*args, **kwargs)
+
+            def compute():
+                result = handler(*args, **kwargs)
+                return _CachedResponse(result) if isinstance(result, Response) else result
+
+            result = route_cache.get_or_compute(_cache_key(request, kwargs, per_user), compute, ttl_seconds)
+            return result.build() if isinstance(result, _CachedResponse) else result
+
+        # FastAPI reads the signature: add the Request the cache key needs
+        if not takes_request:
+            wrapper.__signature__ = signature.replace(parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            ])
+        return wrapper
+    return decorator
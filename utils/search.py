@@ -0,0 +1,75 @@
+"""Full-text recipe search.
+
+Postgres uses a weighted tsvector over name + description with a GIN index,
+SQLite an FTS5 table (see models/recipe.py). Both support prefix matching
+and rank results by relevance.
+
+Build or rebuild the index on an existing database with:
+    python -m utils.search
+"""
+import re
+from sqlalchemy import func, literal_column, or_, text, table, column
+from sqlalchemy.orm import Session, joinedload
+from models.recipe import Recipe, recipe_search_vector, POSTGRES_SEARCH_DDL, SQLITE_SEARCH_DDL
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+recipes_fts = table("recipes_fts", column("rowid"))
+
+
+def tokenize(query: str):
+    return TOKEN_PATTERN.findall(query.lower())
+
+
+def search_recipes(db: Session, query: str, skip: int = 0, limit: int = 20, category_id: int = None):
+    """Return [(recipe, rank)] for available recipes matching every term (prefix match)"""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        vector = literal_column(recipe_search_vector("recipes."))
+        tsquery = func.to_tsquery("english", " & ".join(f"{token}:*" for token in tokens))
+        rank = func.ts_rank_cd(vector, tsquery)
+        results = db.query(Recipe, rank.label("rank")).filter(vector.op("@@")(tsquery))
+        order = [rank.desc(), Recipe.name.asc()]
+    elif dialect == "sqlite":
+        match = " ".join(f'"{token}"*' for token in tokens)
+        # bm25() is lower-is-better, negate it so higher rank means more relevant;
+        # name matches weigh 10x more than description matches
+        rank = literal_column("-bm25(recipes_fts, 10.0, 1.0)")
+        results = db.query(Recipe, rank.label("rank")).join(
+            recipes_fts, recipes_fts.c.rowid == Recipe.id
+        ).filter(text("recipes_fts MATCH :match")).params(match=match)
+        order = [rank.desc(), Recipe.name.asc()]
+    else:
+        # No index available - plain substring match
+        results = db.query(Recipe, literal_column("0.0").label("rank"))
+        for token in tokens:
+            results = results.filter(or_(Recipe.name.ilike(f"%{token}%"), Recipe.description.ilike(f"%{token}%")))
+        order = [Recipe.name.asc()]
+
+    results = results.options(joinedload(Recipe.category)).filter(Recipe.is_available == True)
+    if category_id:
+        results = results.filter(Recipe.category_id == category_id)
+
+    return [(recipe, float(score or 0)) for recipe, score in results.order_by(*order).offset(skip).limit(limit).all()]
+
+
+def build_search_index(engine):
+    """Create the search index if missing and (re)index every recipe"""
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            for statement in POSTGRES_SEARCH_DDL:
+                conn.execute(text(statement))
+        elif conn.dialect.name == "sqlite":
+            for statement in SQLITE_SEARCH_DDL:
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO recipes_fts(recipes_fts) VALUES ('rebuild')"))
+
+
+if __name__ == "__main__":
+    from database import engine
+    build_search_index(engine)
+    print("Recipe search index built successfully!")
@@ -0,0 +1,294 @@
+"""Token service: short-lived access tokens, rotating refresh tokens and revocation.
+
+Access tokens carry everything authorization needs (user id, session id, admin
+flag), so the common request path never touches the database. Logouts and
+rotated refresh tokens are recorded in the revoked_tokens table; each worker
+keeps a Bloom filter of that table, rebuilt every REVOCATION_SYNC_SECONDS, and
+only goes to the database when the filter reports a possible match.
+
+Deactivating a user records a per-user cutoff: tokens issued (iat) before it
+are rejected, so reactivation only admits tokens from new logins. Workers keep
+the cutoffs in a dict next to the filter. The worker that handles the
+deactivation applies it at once; other workers pick it up on their next sync,
+so old tokens keep working there for at most REVOCATION_SYNC_SECONDS.
+"""
+import hashlib
+import math
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import jwt
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from config.enviroment import settings
+from database import SessionLocal
+from models.token import RevokedToken
+from utils.bulk import insert_ignore, upsert
+
+ACCESS = "access"
+REFRESH = "refresh"
+USER = "user"  # revoked_tokens kind holding a user's token cutoff
+
+
+@dataclass(frozen=True)
+class TokenPrincipal:
+    """Authenticated caller, built from access token claims alone"""
+    id: int
+    session_id: str
+    is_admin: bool = False
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RevocationList:
+    """Per-worker Bloom filter of revoked ids, periodically synced from the DB"""
+
+    def __init__(self, sync_seconds: int, capacity: int):
+        self.sync_seconds = sync_seconds
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(capacity)
+        self._user_cutoffs = {}  # user_id -> timestamp; tokens issued before it are rejected
+        self._synced_at = 0.0
+
+    def sync(self):
+        now = _now()
+        with SessionLocal() as db:
+            # Expired entries can't match a live token any more
+            try:
+                db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+                db.commit()
+            except SQLAlchemyError:
+                db.rollback()  # e.g. the table is locked - purge on a later sync
+            rows = db.execute(
+                select(RevokedToken.token_id, RevokedToken.kind, RevokedToken.created_at)
+                .where(RevokedToken.expires_at > now)
+            ).all()
+        ids = [token_id for token_id, kind, _ in rows if kind != USER]
+        bloom = BloomFilter(max(self.capacity, 2 * len(ids)))
+        for token_id in ids:
+            bloom.add(token_id)
+        user_cutoffs = {
+            _user_id(token_id): _timestamp(revoked_at) for token_id, kind, revoked_at in rows if kind == USER
+        }
+        with self._lock:
+            self._bloom = bloom
+            self._user_cutoffs = user_cutoffs
+            self._synced_at = time.monotonic()
+
+    def _maybe_sync(self):
+        if time.monotonic() - self._synced_at < self.sync_seconds:
+            return
+        with self._lock:
+            if time.monotonic() - self._synced_at < self.sync_seconds:
+                return
+            # Claim this sync so concurrent requests keep using the current filter
+            self._synced_at = time.monotonic()
+        self.sync()
+
+    def add_local(self, token_id: str):
+        with self._lock:
+            self._bloom.add(token_id)
+
+    def set_user_cutoff_local(self, user_id: int, cutoff: float):
+        with self._lock:
+            self._user_cutoffs[user_id] = cutoff
+
+    def issued_before_cutoff(self, user_id: int, issued_at) -> bool:
+        """True if the user was deactivated after this token was issued"""
+        self._maybe_sync()
+        cutoff = self._user_cutoffs.get(user_id)
+        return cutoff is not None and (issued_at is None or issued_at < cutoff)
+
+    def is_revoked(self, token_id: str) -> bool:
+        self._maybe_sync()
+        if token_id not in self._bloom:
+            return False
+        # Possible match - confirm, Bloom filters have false positives
+        with SessionLocal() as db:
+            return db.execute(
+                select(RevokedToken.id).where(RevokedToken.token_id == token_id)
+            ).first() is not None
+
+
+revocations = RevocationList(
+    sync_seconds=settings.REVOCATION_SYNC_SECONDS,
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite hands back naive datetimes; everything here is UTC
+    return (value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value).timestamp()
+
+
+def _credentials_error(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def is_admin_email(email: Optional[str]) -> bool:
+    admin_emails = {value.strip().lower() for value in settings.ADMIN_EMAILS.split(",") if value.strip()}
+    return (email or "").lower() in admin_emails
+
+
+def _encode(claims: dict, expires_delta: timedelta) -> str:
+    now = _now()
+    # Sub-second iat (NumericDate may be fractional) so a deactivation cutoff can't tie with it
+    payload = {**claims, "iat": now.timestamp(), "exp": now + expires_delta, "jti": secrets.token_urlsafe(16)}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def create_access_token(user, session_id: str) -> str:
+    return _encode({
+        "sub": str(user.id),
+        "type": ACCESS,
+        "sid": session_id,
+        "admin": is_admin_email(user.email),
+    }, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+
+
+def create_refresh_token(user, session_id: str) -> str:
+    return _encode({
+        "sub": str(user.id),
+        "type": REFRESH,
+        "sid": session_id,
+    }, timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+
+
+def issue_tokens(user, session_id: Optional[str] = None) -> dict:
+    """Access + refresh token pair; a new session unless session_id is given"""
+    session_id = session_id or secrets.token_urlsafe(16)
+    return {
+        "token": create_access_token(user, session_id),
+        "refresh_token": create_refresh_token(user, session_id),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+def decode_token(token: str, expected_type: str) -> dict:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.PyJWTError:
+        raise _credentials_error()
+    if payload.get("type") != expected_type or not payload.get("sub") or not payload.get("sid"):
+        raise _credentials_error()
+    return payload
+
+
+def peek_user_id(token: str) -> Optional[int]:
+    """User id from a validly signed access token, without revocation checks (for rate limiting)"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.PyJWTError:
+        return None
+    if payload.get("type") != ACCESS or not payload.get("sub"):
+        return None
+    return int(payload["sub"])
+
+
+def _user_key(user_id) -> str:
+    # revoked_tokens id of a user's token cutoff
+    return f"user:{user_id}"
+
+
+def _user_id(user_key: str) -> int:
+    return int(user_key.split(":", 1)[1])
+
+
+def authenticate_access_token(token: str) -> TokenPrincipal:
+    """Validate an access token without a database lookup (unless the Bloom filter hits)"""
+    payload = decode_token(token, ACCESS)
+    if revocations.is_revoked(payload["sid"]):
+        raise _credentials_error("Session has been revoked")
+    if revocations.issued_before_cutoff(int(payload["sub"]), payload.get("iat")):
+        raise _credentials_error("Token was issued before the user was deactivated")
+    return TokenPrincipal(id=int(payload["sub"]), session_id=payload["sid"], is_admin=bool(payload.get("admin")))
+
+
+def revoke(db, token_id: str, kind: str, expires_at: datetime) -> bool:
+    """Record a revoked id in the caller's transaction; False if it was already revoked"""
+    inserted = insert_ignore(db.connection(), RevokedToken, [
+        {"token_id": token_id, "kind": kind, "expires_at": expires_at}
+    ], "token_id", returning=["token_id"])
+    if not inserted:
+        return False
+    # Not committed yet - a lookup before the commit just finds nothing in the table
+    revocations.add_local(token_id)
+    return True
+
+
+def revoke_session(db, session_id: str):
+    """Log a session out - its access and refresh tokens stop working once the caller commits"""
+    revoke(db, session_id, "session", _now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+
+
+def revoke_user(db, user_id: int):
+    """Deactivation - every token issued so far stops working, even after a reactivation"""
+    now = _now()
+    # Kept until the last token issued before now has expired; a later deactivation moves the cutoff
+    upsert(db.connection(), RevokedToken, [{
+        "token_id": _user_key(user_id),
+        "kind": USER,
+        "created_at": now,
+        "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    }], "token_id", ["created_at", "expires_at"])
+    revocations.set_user_cutoff_local(user_id, now.timestamp())
+
+
+def rotate_refresh_token(db, refresh_token: str, load_user) -> dict:
+    """Exchange a refresh token for a new pair; reusing a rotated token revokes the session"""
+    payload = decode_token(refresh_token, REFRESH)
+    session_id = payload["sid"]
+    if revocations.is_revoked(session_id):
+        raise _credentials_error("Session has been revoked")
+    if revocations.issued_before_cutoff(int(payload["sub"]), payload.get("iat")):
+        raise _credentials_error("Token was issued before the user was deactivated")
+
+    expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+    if not revoke(db, payload["jti"], REFRESH, expires_at):
+        # Someone replayed an already rotated refresh token - kill the whole session
+        revoke_session(db, session_id)
+        db.commit()
+        raise _credentials_error("Refresh token has already been used")
+
+    # The presented token is used up either way
+    user = load_user(int(payload["sub"]))
+    db.commit()
+    if user is None or not user.is_active:
+        raise _credentials_error("User not found or inactive")
+    return issue_tokens(user, session_id)